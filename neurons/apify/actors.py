@@ -18,8 +18,10 @@ DEALINGS IN THE SOFTWARE.
 """
 
 import os
+import asyncio
 import logging
-from apify_client import ApifyClient
+import threading
+from apify_client import ApifyClientAsync
 
 # Set up logger for the script
 logger = logging.getLogger(__name__)
@@ -43,32 +45,195 @@ class ActorConfig:
         self.actor_id = actor_id  # Actor ID
         self.timeout_secs = 40
         self.memory_mbytes = None 
+        # Dataset fields the caller maps; None downloads whole items.
+        self.fields = None
+        # Skip empty items and hidden (#-prefixed) fields when reading the dataset.
+        self.clean = True
 
 
-def run_actor(actor_config: ActorConfig, run_input: dict, default_dataset_id: str = "defaultDatasetId"):
+# All actor runs are executed on one background event loop, so the pooled async clients
+# (and their HTTP connection pools) are always used from the loop that created them.
+_loop = None
+_loop_lock = threading.Lock()
+_clients = {}
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """
+    Return the shared actor event loop, starting its thread on first use.
+    """
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="apify-actors", daemon=True)
+            thread.start()
+            _loop = loop
+        return _loop
+
+
+def get_client(api_key: str) -> ApifyClientAsync:
+    """
+    Return the pooled async Apify client for an API key, creating it on first use.
+
+    Must be called from the shared actor event loop.
+    """
+    client = _clients.get(api_key)
+    if client is None:
+        client = ApifyClientAsync(api_key)
+        _clients[api_key] = client
+    return client
+
+
+async def _call_actor(actor_config: ActorConfig, run_input: dict) -> dict:
+    client = get_client(actor_config.api_key)
+    logger.info(f"Running actor: {actor_config.actor_id}")
+
+    # Start the actor run
+    run = await client.actor(actor_config.actor_id).start(run_input=run_input,
+                                                          timeout_secs=actor_config.timeout_secs,
+                                                          memory_mbytes=actor_config.memory_mbytes)
+    try:
+        run = await client.run(run["id"]).wait_for_finish()
+    except asyncio.CancelledError:
+        # A caller that gave up on the run should not keep paying for it.
+        logger.info(f"Aborting actor run: {run['id']}")
+        await asyncio.shield(_abort_run(client, run["id"]))
+        raise
+    logger.info(f"Actor run: {run}")
+    return run
+
+
+async def _abort_run(client: ApifyClientAsync, run_id: str):
+    try:
+        await client.run(run_id).abort()
+    except Exception as e:
+        logger.warning(f"Failed to abort actor run {run_id}: {e}")
+
+
+def _dataset_options(actor_config: ActorConfig, fields: list = None) -> dict:
+    """
+    Build the dataset read options, so only the fields a provider maps cross the network.
+    """
+    fields = fields if fields is not None else actor_config.fields
+    return {
+        "fields": list(fields) if fields else None,
+        "clean": actor_config.clean,
+        "skip_empty": actor_config.clean,
+    }
+
+
+async def _list_page(actor_config: ActorConfig, dataset_id: str, offset: int, limit: int, fields: list = None):
+    page = await get_client(actor_config.api_key).dataset(dataset_id).list_items(offset=offset, limit=limit, **_dataset_options(actor_config, fields))
+    return page.items, page.total
+
+
+async def _run_actor(actor_config: ActorConfig, run_input: dict, default_dataset_id: str, fields: list = None) -> list:
+    run = await _call_actor(actor_config, run_input)
+
+    # Fetch data items from the specified dataset
+    dataset = get_client(actor_config.api_key).dataset(run[default_dataset_id])
+    data_set = [item async for item in dataset.iterate_items(**_dataset_options(actor_config, fields))]
+
+    logger.info(f"Fetched {len(data_set)} items from dataset")
+    return data_set
+
+
+async def run_actor_async(actor_config: ActorConfig, run_input: dict, default_dataset_id: str = "defaultDatasetId", fields: list = None):
+    """
+    Run an actor in Apify and fetch the resulting data without blocking the caller's event loop.
+
+    Many runs can be awaited at once, e.g. with asyncio.gather. They all share one pooled
+    client per API key. Cancelling the call aborts the actor run.
+
+    Args:
+        actor_config (ActorConfig): The configuration to use for running the actor.
+        run_input (dict): The input parameters for the actor run.
+        default_dataset_id (str, optional): ID of the dataset to fetch data from. Defaults to "defaultDatasetId".
+        fields (list, optional): Dataset fields to fetch. Defaults to actor_config.fields.
+
+    Returns:
+        list[dict]: List of items fetched from the dataset.
+    """
+    loop = _get_loop()
+    coroutine = _run_actor(actor_config, run_input, default_dataset_id, fields)
+    try:
+        running_loop = asyncio.get_running_loop()
+    except RuntimeError:
+        running_loop = None
+    if running_loop is loop:
+        return await coroutine
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coroutine, loop))
+
+
+def _wait(future):
+    """
+    Block on a future of the shared actor loop. If the wait is interrupted, the future is cancelled, which aborts its actor run.
+    """
+    try:
+        return future.result()
+    except BaseException:
+        future.cancel()
+        raise
+
+
+def run_actor(actor_config: ActorConfig, run_input: dict, default_dataset_id: str = "defaultDatasetId", fields: list = None):
     """
     Run an actor in Apify and fetch the resulting data.
 
+    This is a blocking wrapper around `run_actor_async`: the run executes on the shared actor
+    loop, and a caller interrupted while waiting aborts it.
+
     Args:
         actor_config (ActorConfig): The configuration to use for running the actor.
         run_input (dict): The input parameters for the actor run.
         default_dataset_id (str, optional): ID of the dataset to fetch data from. Defaults to "defaultDatasetId".
+        fields (list, optional): Dataset fields to fetch. Defaults to actor_config.fields.
 
     Returns:
         list[dict]: List of items fetched from the dataset.
     """
-    # Initialize the Apify client with the API key
-    client = ApifyClient(actor_config.api_key)
-    logger.info(f"Running actor: {actor_config.actor_id}")
-    
-     # Start the actor run
-    run = client.actor(actor_config.actor_id).call(run_input=run_input, 
-                                                   timeout_secs=actor_config.timeout_secs, 
-                                                   memory_mbytes=actor_config.memory_mbytes)
-    logger.info(f"Actor run: {run}")
+    coroutine = run_actor_async(actor_config, run_input, default_dataset_id, fields)
+    return _wait(asyncio.run_coroutine_threadsafe(coroutine, _get_loop()))
 
-    # Fetch data items from the specified dataset
-    data_set = [item for item in client.dataset(run[default_dataset_id]).iterate_items()]
 
-    logger.info(f"Fetched {len(data_set)} items from dataset")
-    return data_set
+def stream_actor(actor_config: ActorConfig, run_input: dict, default_dataset_id: str = "defaultDatasetId", page_size: int = 100, fields: list = None):
+    """
+    Run an actor in Apify and yield the resulting items page by page.
+
+    The next page is requested while the caller consumes the current one. Closing the
+    generator early (e.g. once enough items were accepted) stops any further page reads.
+
+    Args:
+        actor_config (ActorConfig): The configuration to use for running the actor.
+        run_input (dict): The input parameters for the actor run.
+        default_dataset_id (str, optional): ID of the dataset to fetch data from. Defaults to "defaultDatasetId".
+        page_size (int, optional): Number of items requested per page. Defaults to 100.
+        fields (list, optional): Dataset fields to fetch. Defaults to actor_config.fields.
+
+    Yields:
+        dict: Items from the dataset.
+    """
+    loop = _get_loop()
+    run = _wait(asyncio.run_coroutine_threadsafe(_call_actor(actor_config, run_input), loop))
+    dataset_id = run[default_dataset_id]
+
+    offset = 0
+    fetched = 0
+    pending = asyncio.run_coroutine_threadsafe(_list_page(actor_config, dataset_id, offset, page_size, fields), loop)
+    try:
+        while pending is not None:
+            items, total = pending.result()
+            fetched += len(items)
+            # Offsets count raw dataset items; skipped empty items can make a page short.
+            offset += page_size
+            # Prefetch the following page before handing this one to the caller.
+            if offset < total:
+                pending = asyncio.run_coroutine_threadsafe(_list_page(actor_config, dataset_id, offset, page_size, fields), loop)
+            else:
+                pending = None
+            yield from items
+    finally:
+        if pending is not None:
+            pending.cancel()
+        logger.info(f"Streamed {fetched} items from dataset")
@@ -1,6 +1,6 @@
 import logging
-from neurons.apify.actors import run_actor, ActorConfig
-from datetime import datetime
+from neurons.apify.actors import run_actor, stream_actor, ActorConfig
+from neurons.timestamps import format_iso_millis
 
 # Setting up logger for debugging and information purposes
 logger = logging.getLogger(__name__)
@@ -18,6 +18,7 @@ class EpctexRedditScraper:
         Initialize the EpctexRedditScraper.
         """
         self.actor_config = ActorConfig("jwR5FKaWaGSmkeq2b")
+        self.actor_config.fields = ['id', 'url', 'title', 'text', 'score', 'type', 'createdAt']
 
     def searchByUrl(self, urls: list = ["https://twitter.com/elonmusk/status/1384874438472844800"]):
         run_input = {
@@ -33,7 +34,8 @@ class EpctexRedditScraper:
             "time": "all"
         }
 
-        posts = run_actor(self.actor_config, run_input)
+        # Comments are flattened below, so fetch them along with the mapped post fields.
+        posts = run_actor(self.actor_config, run_input, fields=self.actor_config.fields + ['comments'])
 
         # Flatten list, un-nesting comments
         def flatten_comments(comments, flat_list):
@@ -89,28 +91,33 @@ class EpctexRedditScraper:
             "time": "all"
         }
 
-        return self.map(run_actor(self.actor_config, run_input))
+        return self.map(stream_actor(self.actor_config, run_input), limit_number)
 
-    def map(self, input: list) -> list:
+    def map(self, input: list, limit_number: int = None) -> list:
         """
         Potentially map the input data as needed. As of now, this method serves as a placeholder and simply returns the
         input data directly.
 
         Args:
-            input (list): The data to potentially map or transform.
+            input (iterable): The data to potentially map or transform.
+            limit_number (int, optional): Stop reading the input once this many items were mapped.
 
         Returns:
             list: The mapped or transformed data.
         """
-        filtered_input = [
-            {'id': item['id'], 
-             'url': item['url'],
-             'title': item.get('title'),
-             'text': item['text'], 
-             'likes': item['score'], 
-             'dataType': item['type'], 
-             'timestamp': datetime.utcfromtimestamp(item['createdAt']).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
-             } for item in input]
+        filtered_input = []
+        for item in input:
+            filtered_input.append(
+                {'id': item['id'], 
+                 'url': item['url'],
+                 'title': item.get('title'),
+                 'text': item['text'], 
+                 'likes': item['score'], 
+                 'dataType': item['type'], 
+                 'timestamp': format_iso_millis(item['createdAt'])
+                 })
+            if limit_number is not None and len(filtered_input) >= limit_number:
+                break
         return filtered_input
 
 
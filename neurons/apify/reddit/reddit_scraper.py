@@ -1,5 +1,5 @@
 import logging
-from neurons.apify.actors import run_actor, ActorConfig
+from neurons.apify.actors import run_actor, stream_actor, ActorConfig
 
 # Setting up logger for debugging and information purposes
 logger = logging.getLogger(__name__)
@@ -17,6 +17,7 @@ class RedditScraper:
         Initialize the RedditScraper
         """
         self.actor_config = ActorConfig("FgJtjDwJCLhRH9saM")
+        self.actor_config.fields = ['id', 'url', 'body', 'upVotes', 'dataType', 'createdAt']
 
     def searchByUrl(self, urls: list = ["https://twitter.com/elonmusk/status/1384874438472844800"]):
         """
@@ -74,20 +75,25 @@ class RedditScraper:
             "skipComments": False
             }
 
-        return self.map(run_actor(self.actor_config, run_input))
+        return self.map(stream_actor(self.actor_config, run_input), limit_number)
 
-    def map(self, input: list) -> list:
+    def map(self, input: list, limit_number: int = None) -> list:
         """
         Potentially map the input data as needed. As of now, this method serves as a placeholder and simply returns the
         input data directly.
 
         Args:
-            input (list): The data to potentially map or transform.
+            input (iterable): The data to potentially map or transform.
+            limit_number (int, optional): Stop reading the input once this many items were mapped.
 
         Returns:
             list: The mapped or transformed data.
         """
-        filtered_input = [{'id': item['id'], 'url': item['url'], 'text': item['body'], 'likes': item['upVotes'], 'dataType': item['dataType'], 'timestamp': item['createdAt']} for item in input]
+        filtered_input = []
+        for item in input:
+            filtered_input.append({'id': item['id'], 'url': item['url'], 'text': item['body'], 'likes': item['upVotes'], 'dataType': item['dataType'], 'timestamp': item['createdAt']})
+            if limit_number is not None and len(filtered_input) >= limit_number:
+                break
         return filtered_input
 
 
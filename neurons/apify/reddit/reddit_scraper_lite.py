@@ -1,5 +1,5 @@
 import logging
-from neurons.apify.actors import run_actor, ActorConfig
+from neurons.apify.actors import run_actor, stream_actor, ActorConfig
 
 # Setting up logger for debugging and information purposes
 logger = logging.getLogger(__name__)
@@ -18,6 +18,7 @@ class RedditScraperLite:
         """
         self.actor_config = ActorConfig("oAuCIx3ItNrs2okjQ")
         self.actor_config.memory_mbytes = 4096
+        self.actor_config.fields = ['id', 'url', 'title', 'body', 'upVotes', 'dataType', 'communityName', 'username', 'parentId', 'createdAt']
 
 
     def searchByUrl(self, urls: list = ["https://twitter.com/elonmusk/status/1384874438472844800"]):
@@ -79,36 +80,38 @@ class RedditScraperLite:
             "skipComments": False
             }
 
-        return self.map(run_actor(self.actor_config, run_input))
+        return self.map(stream_actor(self.actor_config, run_input), limit_number)
 
-    def map(self, input: list) -> list:
+    def map(self, input: list, limit_number: int = None) -> list:
         """
         Potentially map the input data as needed. As of now, this method serves as a placeholder and simply returns the
         input data directly.
 
         Args:
-            input (list): The data to potentially map or transform.
+            input (iterable): The data to potentially map or transform.
+            limit_number (int, optional): Stop reading the input once this many items were mapped.
 
         Returns:
             list: The mapped or transformed data.
         """
-        filtered_input = [{
-            'id': item['id'], 
-            #'title': item['title'], 
-            'url': item['url'], 
-            'text': item['body'], 
-            'likes': item['upVotes'], 
-            'dataType': item['dataType'], 
-            'community': item['communityName'],
-            'username': item['username'],
-            'parent': item.get('parentId'),
-            'timestamp': item['createdAt']
-        } for item in input]
-
-        for i in range(len(input)):
-            item = input[i];
-            if filtered_input[i]["dataType"] == "post":
-                filtered_input[i]["title"] = item["title"]
+        filtered_input = []
+        for item in input:
+            entry = {
+                'id': item['id'], 
+                'url': item['url'], 
+                'text': item['body'], 
+                'likes': item['upVotes'], 
+                'dataType': item['dataType'], 
+                'community': item['communityName'],
+                'username': item['username'],
+                'parent': item.get('parentId'),
+                'timestamp': item['createdAt']
+            }
+            if entry["dataType"] == "post":
+                entry["title"] = item["title"]
+            filtered_input.append(entry)
+            if limit_number is not None and len(filtered_input) >= limit_number:
+                break
         return filtered_input
 
 
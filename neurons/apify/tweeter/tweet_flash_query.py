@@ -1,5 +1,6 @@
 import logging
-from neurons.apify.actors import run_actor, ActorConfig
+from datetime import datetime, timezone
+from neurons.apify.actors import run_actor, run_actor_async, stream_actor, ActorConfig
 
 # Setting up logger for debugging and information purposes
 logger = logging.getLogger(__name__)
@@ -19,13 +20,26 @@ class TweetFlashQuery:
         self.actor_config = ActorConfig("wHMoznVs94gOcxcZl")
         self.actor_config.memory_mbytes = 512
         self.actor_config.timeout_secs = 40
+        self.actor_config.fields = ['tweet_id', 'url', 'text', 'likes', 'images', 'username', 'tweet_hashtags', 'timestamp']
 
 
     def searchByUrl(self, urls: list = ["https://twitter.com/elonmusk/status/1384874438472844800"]):
         """
         Search for tweets by url.
         """
-        run_input = {
+        return self.map(run_actor(self.actor_config, self._url_run_input(urls)))
+
+    async def searchByUrlAsync(self, urls: list = ["https://twitter.com/elonmusk/status/1384874438472844800"]):
+        """
+        Search for tweets by url without blocking the event loop.
+        """
+        return self.map(await run_actor_async(self.actor_config, self._url_run_input(urls)))
+
+    def _url_run_input(self, urls: list) -> dict:
+        """
+        Build the actor input for a search by url.
+        """
+        return {
             "filter:blue_verified": False,
             "filter:has_engagement": False,
             "filter:images": False,
@@ -47,19 +61,44 @@ class TweetFlashQuery:
             "user_info": "only user info",
             "max_attempts": 5
             }
-        return self.map(run_actor(self.actor_config, run_input))
     
-    def execute(self, search_queries: list = ["bittensor"], limit_number: int = 15, validator_key: str = "None", validator_version: str = None, miner_uid: int = 0) -> list:
+    def execute(self, search_queries: list = ["bittensor"], limit_number: int = 15, validator_key: str = "None", validator_version: str = None, miner_uid: int = 0, since: int = None) -> list:
         """
         Search for tweets using search terms.
 
         Args:
             search_queries (list, optional): A list of search terms to be queried. Defaults to ["bittensor"].
+            since (int, optional): Only search tweets posted at or after this epoch time.
 
         Returns:
             list: A list of tweets.
         """
-        run_input = {
+        run_input = self._search_run_input(search_queries, limit_number, since)
+        return self.map(stream_actor(self.actor_config, run_input), search_queries[0], limit_number)
+
+    async def executeAsync(self, search_queries: list = ["bittensor"], limit_number: int = 15, validator_key: str = "None", validator_version: str = None, miner_uid: int = 0, since: int = None) -> list:
+        """
+        Search for tweets using search terms without blocking the event loop.
+
+        Args:
+            search_queries (list, optional): A list of search terms to be queried. Defaults to ["bittensor"].
+            since (int, optional): Only search tweets posted at or after this epoch time.
+
+        Returns:
+            list: A list of tweets.
+        """
+        run_input = self._search_run_input(search_queries, limit_number, since)
+        return self.map(await run_actor_async(self.actor_config, run_input), search_queries[0], limit_number)
+
+    def _search_run_input(self, search_queries: list, limit_number: int, since: int = None) -> dict:
+        """
+        Build the actor input for a keyword search.
+        """
+        if since is not None:
+            # Twitter's since: operator accepts a UTC time, so only newer tweets are scraped.
+            since_str = datetime.fromtimestamp(since, timezone.utc).strftime("%Y-%m-%d_%H:%M:%S_UTC")
+            search_queries = [f"{query} since:{since_str}" for query in search_queries]
+        return {
             "collect_user_info": False,
             "detect_language": False,
             "filter:blue_verified": False,
@@ -84,15 +123,15 @@ class TweetFlashQuery:
             "max_attempts": 10
         }
 
-        return self.map(run_actor(self.actor_config, run_input), search_queries[0])
-
-    def map(self, _input: list, query : str) -> list:
+    def map(self, _input: list, query : str = None, limit_number: int = None) -> list:
         """
         Potentially map the input data as needed. As of now, this method serves as a placeholder and simply returns the
         input data directly.
 
         Args:
-            input (list): The data to potentially map or transform.
+            input (iterable): The data to potentially map or transform.
+            query (str, optional): Only keep tweets containing this term.
+            limit_number (int, optional): Stop reading the input once this many tweets were kept.
 
         Returns:
             list: The mapped or transformed data.
@@ -100,7 +139,7 @@ class TweetFlashQuery:
 
         filtered_input = []
         for item in _input:
-            if query.lower() in item['text'].lower():
+            if query is None or query.lower() in item['text'].lower():
                 entry = {
                     'id': item['tweet_id'], 
                     'url': item['url'], 
@@ -113,6 +152,8 @@ class TweetFlashQuery:
                 }
 
                 filtered_input.append(entry)
+                if limit_number is not None and len(filtered_input) >= limit_number:
+                    break
 
         return filtered_input
 
@@ -1,6 +1,6 @@
 import logging
-from datetime import datetime
-from neurons.apify.actors import run_actor, ActorConfig
+from neurons.timestamps import to_utc_text
+from neurons.apify.actors import run_actor, run_actor_async, ActorConfig
 
 # Setting up logger for debugging and information purposes
 logger = logging.getLogger(__name__)
@@ -18,12 +18,25 @@ class WebHarvesterTwitterScraperQuery:
         Initialize the WebHarvesterTwitterScraperQuery.
         """
         self.actor_config = ActorConfig("VsTreSuczsXhhRIqa")
+        self.actor_config.fields = ['id', 'url', 'text', 'likes', 'timestamp']
 
     def searchByUrl(self, urls: list = ["https://twitter.com/const_reborn/status/1725967725762134121", "https://twitter.com/opentensor/status/1713958073226649948"]):
         """
         Execute the tweet query process using the specified search queries.
         """
-        run_input = {
+        return self.map(run_actor(self.actor_config, self._url_run_input(urls)))
+
+    async def searchByUrlAsync(self, urls: list = ["https://twitter.com/const_reborn/status/1725967725762134121", "https://twitter.com/opentensor/status/1713958073226649948"]):
+        """
+        Search for tweets by url without blocking the event loop.
+        """
+        return self.map(await run_actor_async(self.actor_config, self._url_run_input(urls)))
+
+    def _url_run_input(self, urls: list) -> dict:
+        """
+        Build the actor input for a search by url.
+        """
+        return {
             "includeUserInfo": False,
             "proxyConfig": {
                 "useApifyProxy": True,
@@ -35,7 +48,6 @@ class WebHarvesterTwitterScraperQuery:
             "tweetsDesired": 1,
             "withReplies": True
         }
-        return self.map(run_actor(self.actor_config, run_input))
     
     def execute(self, search_queries: list = ["bittensor"], limit_number: int = 15) -> list:
         """
@@ -65,7 +77,7 @@ class WebHarvesterTwitterScraperQuery:
             'url': item['url'], 
             'text': item['text'], 
             'likes': item['likes'],
-            'timestamp': str(datetime.fromisoformat(item['timestamp'].replace("Z", "+00:00")))
+            'timestamp': to_utc_text(item['timestamp'])
             } for item in input]
         return filtered_input
 
@@ -0,0 +1,289 @@
+"""
+The MIT License (MIT)
+Copyright © 2023 Chris Wilson
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+the Software.
+
+THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Hashable, Tuple
+import bittensor as bt
+
+
+def cache_key(source: str, search_key) -> Tuple[str, Tuple[str, ...]]:
+    """
+    Build a cache key from a source name and a validator search key.
+
+    Validators send the search key as a list of keywords, so the keywords are stripped
+    and lowercased to make "Bitcoin " and "bitcoin" share an entry.
+
+    Args:
+        source (str): The data source, e.g. "twitter" or "reddit".
+        search_key (list | str): The keyword(s) from the synapse scrap_input.
+
+    Returns:
+        tuple: A hashable key.
+    """
+    if isinstance(search_key, str):
+        search_key = [search_key]
+    return (source, tuple(str(keyword).strip().lower() for keyword in search_key))
+
+
+class SingleFlight:
+    """
+    An in-flight request table that coalesces concurrent calls for the same key.
+
+    The first caller for a key starts the function; callers arriving while it is running
+    wait on the same future instead of starting their own scrape. Each waiter, the first
+    caller included, has its own deadline, and an exception raised by the function is
+    re-raised in every waiter.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.leaders = 0
+        self.followers = 0
+
+    def do(self, key: Hashable, fn: Callable[[], object], timeout: float = None):
+        """
+        Run `fn` for `key`, or wait for the identical call that is already running.
+
+        Args:
+            key (Hashable): Identifies identical requests.
+            fn (Callable): Zero-argument function producing the result.
+            timeout (float, optional): Seconds this caller is willing to wait for the result.
+                With a timeout the leader runs `fn` on a separate thread, which carries on past
+                the leader's deadline so followers and later callers still get the result.
+
+        Returns:
+            The result of `fn`.
+
+        Raises:
+            concurrent.futures.TimeoutError: If the shared call does not finish within `timeout`.
+            Exception: Whatever `fn` raised.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+                self.leaders += 1
+            else:
+                self.followers += 1
+
+        if not leader:
+            return future.result(timeout=timeout)
+
+        if timeout is None:
+            self._run(key, fn, future)
+        else:
+            threading.Thread(target=self._run, args=(key, fn, future), name="single-flight", daemon=True).start()
+        return future.result(timeout=timeout)
+
+    def _run(self, key: Hashable, fn: Callable[[], object], future: Future):
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def in_flight(self) -> int:
+        """
+        Return the number of keys currently being fetched.
+        """
+        with self._lock:
+            return len(self._calls)
+
+
+class _Entry:
+    """
+    A single cached value along with the time it was stored.
+    """
+    __slots__ = ("value", "stored_at")
+
+    def __init__(self, value, stored_at: float):
+        self.value = value
+        self.stored_at = stored_at
+
+
+class ResultCache:
+    """
+    A bounded, thread-safe LRU cache for scrape results.
+
+    Entries younger than `ttl` seconds are served as fresh. Entries older than `ttl` but
+    younger than `ttl + stale_ttl` are served immediately while a background refresh
+    replaces them (stale-while-revalidate). Anything older is treated as a miss.
+
+    Attributes:
+        max_entries (int): Maximum number of keys kept before the least recently used is evicted.
+        ttl (float): Seconds an entry is considered fresh.
+        stale_ttl (float): Extra seconds a stale entry may still be served while refreshing.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = 300, stale_ttl: float = 900, refresh_workers: int = 2):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._refresh_pool = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix="cache-refresh")
+        self._flight = SingleFlight()
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self.evictions = 0
+        self._hit_age_total = 0.0
+
+    def get(self, key: Hashable):
+        """
+        Return the cached value for `key` regardless of freshness, or None.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry.value
+
+    def age(self, key: Hashable) -> float:
+        """
+        Return the age of the entry for `key` in seconds, or infinity when not cached.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            return float("inf") if entry is None else time.time() - entry.stored_at
+
+    def put(self, key: Hashable, value):
+        """
+        Store `value` under `key`, evicting the least recently used entries if needed.
+        """
+        with self._lock:
+            self._entries[key] = _Entry(value, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_fetch(self, key: Hashable, fetch: Callable[[], object], timeout: float = None):
+        """
+        Return the value for `key`, calling `fetch` on a miss.
+
+        Fresh entries are returned as is. Stale entries are returned as is and refreshed in
+        the background. Misses and expired entries block on `fetch` and store its result.
+        Concurrent misses for the same key share a single call to `fetch`.
+
+        Args:
+            key (Hashable): The cache key, see `cache_key`.
+            fetch (Callable): Zero-argument function producing the value.
+            timeout (float, optional): Seconds to wait for the fetch, whether this request or another one started it.
+
+        Returns:
+            The cached or freshly fetched value.
+
+        Raises:
+            concurrent.futures.TimeoutError: If the fetch does not finish within `timeout`. It
+                keeps running, and its result is stored when it does.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = now - entry.stored_at
+                if age <= self.ttl + self.stale_ttl:
+                    self._entries.move_to_end(key)
+                    self._hit_age_total += age
+                    if age <= self.ttl:
+                        self.hits += 1
+                        return entry.value
+                    self.stale_hits += 1
+                    stale_value = entry.value
+                else:
+                    entry = None
+            if entry is None:
+                self.misses += 1
+
+        if entry is not None:
+            self.refresh(key, fetch)
+            return stale_value
+
+        return self.load(key, fetch, timeout=timeout)
+
+    def load(self, key: Hashable, fetch: Callable[[], object], timeout: float = None):
+        """
+        Call `fetch` now and store its result, sharing the call with any identical fetch in flight.
+        """
+        return self._flight.do(key, lambda: self._fetch_and_put(key, fetch), timeout=timeout)
+
+    def _fetch_and_put(self, key: Hashable, fetch: Callable[[], object]):
+        value = fetch()
+        self.put(key, value)
+        return value
+
+    def refresh(self, key: Hashable, fetch: Callable[[], object]) -> bool:
+        """
+        Schedule a background refresh of `key` unless one is already running.
+
+        Returns:
+            bool: True if a refresh was scheduled.
+        """
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+        self._refresh_pool.submit(self._refresh, key, fetch)
+        return True
+
+    def _refresh(self, key: Hashable, fetch: Callable[[], object]):
+        try:
+            self.load(key, fetch)
+            self.refreshes += 1
+        except Exception as e:
+            self.refresh_errors += 1
+            bt.logging.warning(f"Background refresh failed for {key}: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def stats(self) -> dict:
+        """
+        Return counters describing cache effectiveness.
+        """
+        with self._lock:
+            served = self.hits + self.stale_hits
+            lookups = served + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "hit_ratio": served / lookups if lookups else 0.0,
+                "mean_hit_age": self._hit_age_total / served if served else 0.0,
+                "refreshes": self.refreshes,
+                "refresh_errors": self.refresh_errors,
+                "evictions": self.evictions,
+                "in_flight": self._flight.in_flight(),
+                "coalesced": self._flight.followers,
+            }
@@ -0,0 +1,114 @@
+"""
+The MIT License (MIT)
+Copyright © 2023 Chris Wilson
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+the Software.
+
+THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+import time
+import asyncio
+from typing import List
+import bittensor as bt
+
+
+class Intake:
+    """
+    The responses of one round as collected by collect().
+
+    Attributes:
+        responses (list): The deserialized responses in query order; None for miners that did not answer in time.
+        timed_out (list): Query positions of the miners without a response when the round closed.
+        latencies (list): Seconds until each call returned; None for calls still open at the close.
+        secs (float): How long the intake took.
+    """
+
+    def __init__(self, size: int):
+        self.responses = [None] * size
+        self.latencies = [None] * size
+        self.timed_out = []
+        self.secs = 0.0
+
+
+async def collect(dendrite: "bt.dendrite", axons: list, synapse: "bt.Synapse", deadline: float = 60, quorum: float = 1.0, max_connections: int = 16) -> Intake:
+    """
+    Query `axons` one call each and take their responses in as they complete.
+
+    At most `max_connections` calls are open at once. The round closes once `quorum` (a
+    fraction of the axons) have answered or `deadline` seconds have passed, whichever is
+    first; calls still open are cancelled. Miners without a response at that point are
+    reported in `timed_out`.
+
+    Responses are not format checked here. The scorer reads every item once while it
+    flattens the round, and that read is the format check.
+
+    Spot-check items are not picked here. The verification planner picks them while the
+    round is scored, from each miner's check history, and packs them into provider calls
+    across the whole round.
+
+    Args:
+        dendrite (bt.dendrite): The validator's dendrite.
+        axons (list): The axons to query.
+        synapse (bt.Synapse): The request; each call sends its own copy.
+        deadline (float): Seconds after which the round closes.
+        quorum (float): Fraction of answers after which the round closes early.
+        max_connections (int): Maximum number of calls open at once.
+
+    Returns:
+        Intake: The collected responses.
+    """
+    intake = Intake(len(axons))
+    if len(axons) == 0:
+        return intake
+    start = time.time()
+    close_at = start + deadline
+    needed = max(1, min(len(axons), int(round(quorum * len(axons)))))
+    connections = asyncio.Semaphore(max_connections)
+
+    async def call(position: int, axon):
+        async with connections:
+            remaining = close_at - time.time()
+            if remaining <= 0:
+                return position, None
+            response = await dendrite.call(target_axon = axon, synapse = synapse.copy(), timeout = remaining, deserialize = True)
+            return position, response
+
+    tasks = [asyncio.ensure_future(call(position, axon)) for position, axon in enumerate(axons)]
+    answered = 0
+    try:
+        for next_done in asyncio.as_completed(tasks, timeout = deadline):
+            try:
+                position, response = await next_done
+            except asyncio.TimeoutError:
+                raise
+            except Exception as e:
+                bt.logging.trace(f"Call failed: {e}")
+                continue
+            intake.latencies[position] = time.time() - start
+            if response is None:
+                continue
+            intake.responses[position] = response
+            answered += 1
+            if answered >= needed:
+                break
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+    intake.timed_out = [position for position, response in enumerate(intake.responses) if response is None]
+    intake.secs = time.time() - start
+    return intake
@@ -0,0 +1,126 @@
+"""
+The MIT License (MIT)
+Copyright © 2023 Chris Wilson
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+the Software.
+
+THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+import os
+import time
+import random
+import threading
+from collections import Counter, deque
+from typing import List
+import bittensor as bt
+
+
+class KeywordSampler:
+    """
+    Draws search keywords from a keyword file kept in memory.
+
+    The file is read once and read again only when its modification time changes, which
+    is checked at most every `check_interval` seconds. Keywords picked within the last
+    `recent_window` draws are accepted with probability `recent_weight` only, so the same
+    keyword is rarely drawn twice in a short span. A draw is a few constant-time random
+    picks and never touches the file.
+    """
+
+    def __init__(self, path: str = "keywords.txt", recent_window: int = 50, recent_weight: float = 0.1, check_interval: float = 5.0, max_tries: int = 8):
+        """
+        Args:
+            path (str): The keyword file, one keyword per line.
+            recent_window (int): Number of recent draws remembered.
+            recent_weight (float): Relative chance of drawing a recently drawn keyword again.
+            check_interval (float): Minimum seconds between two checks of the file's mtime.
+            max_tries (int): Draws attempted before a recently drawn keyword is accepted anyway.
+        """
+        self.path = path
+        self.recent_weight = recent_weight
+        self.check_interval = check_interval
+        self.max_tries = max_tries
+        self.reloads = 0
+        self._lock = threading.Lock()
+        self._keywords = []
+        self._mtime = None
+        self._checked = 0.0
+        self._recent = deque(maxlen=recent_window)
+        self._recent_counts = Counter()
+        self._reload(force=True)
+
+    def _reload(self, force: bool = False):
+        now = time.time()
+        if not force and now - self._checked < self.check_interval:
+            return
+        self._checked = now
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            return
+        if mtime == self._mtime:
+            return
+        try:
+            with open(self.path) as f:
+                keywords = [line.strip() for line in f.read().splitlines() if line.strip()]
+        except OSError as e:
+            bt.logging.error(f"Could not read keyword file {self.path}: {e}")
+            return
+        with self._lock:
+            self._keywords = keywords
+            self._mtime = mtime
+            self.reloads += 1
+        bt.logging.info(f"Loaded {len(keywords)} keywords from {self.path}")
+
+    def __len__(self) -> int:
+        self._reload()
+        return len(self._keywords)
+
+    def keywords(self) -> List[str]:
+        """
+        Return the current keyword list.
+        """
+        self._reload()
+        return self._keywords
+
+    def sample(self) -> str:
+        """
+        Draw a keyword, preferring ones not drawn recently.
+
+        Raises:
+            ValueError: If the keyword file is missing or empty.
+        """
+        self._reload()
+        with self._lock:
+            keywords = self._keywords
+            if len(keywords) == 0:
+                raise ValueError(f"No keywords available from {self.path}")
+            for _ in range(self.max_tries):
+                keyword = random.choice(keywords)
+                if self._recent_counts[keyword] == 0 or random.random() < self.recent_weight:
+                    break
+            if len(self._recent) == self._recent.maxlen:
+                oldest = self._recent[0]
+                self._recent_counts[oldest] -= 1
+                if self._recent_counts[oldest] == 0:
+                    del self._recent_counts[oldest]
+            self._recent.append(keyword)
+            self._recent_counts[keyword] += 1
+            return keyword
+
+    def recent(self) -> List[str]:
+        """
+        Return the recently drawn keywords, oldest first.
+        """
+        with self._lock:
+            return list(self._recent)
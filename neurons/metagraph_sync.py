@@ -0,0 +1,145 @@
+"""
+The MIT License (MIT)
+Copyright © 2023 Chris Wilson
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+the Software.
+
+THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+import asyncio
+import threading
+import traceback
+import torch
+import bittensor as bt
+
+
+class MetagraphSnapshot:
+    """
+    An immutable view of the metagraph at one block, with the vectors derived from it.
+
+    A snapshot is never modified after it is built; a newer sync replaces it as a whole,
+    so readers holding a reference always see a consistent network state.
+
+    Lookups on the request path (is this hotkey registered, what is its uid or stake) are
+    dictionary and list lookups instead of scans over metagraph.hotkeys.
+
+    Attributes:
+        block (int): The block the metagraph was synced at.
+        metagraph (bt.metagraph): The synced metagraph.
+        uids (list): The uids of all neurons.
+        hotkeys (list): The hotkey of every uid, indexed by uid.
+        uid_by_hotkey (dict): Maps each registered hotkey to its uid.
+        stake (list): The stake of every uid as a float, indexed by uid.
+        validator_permit (list): Whether every uid holds a validator permit, indexed by uid.
+        axons (list): The axon info of every uid, indexed by uid.
+        serving (torch.Tensor): 1.0 for uids with a served axon, 0.0 otherwise.
+    """
+
+    def __init__(self, metagraph: "bt.metagraph", block: int = None):
+        self.metagraph = metagraph
+        self.block = int(metagraph.block.item()) if block is None else block
+        self.uids = metagraph.uids.tolist()
+        self.hotkeys = list(metagraph.hotkeys)
+        self.uid_by_hotkey = {hotkey: uid for uid, hotkey in enumerate(self.hotkeys)}
+        self.stake = [float(stake) for stake in metagraph.S.tolist()]
+        self.validator_permit = [bool(permit) for permit in metagraph.validator_permit.tolist()]
+        self.axons = list(metagraph.axons)
+        self.serving = torch.Tensor([axon.ip != '0.0.0.0' for axon in self.axons])
+
+    def __len__(self) -> int:
+        return len(self.uids)
+
+    def is_registered(self, hotkey: str) -> bool:
+        """
+        Return whether `hotkey` is registered on the subnet.
+        """
+        return hotkey in self.uid_by_hotkey
+
+    def uid_of(self, hotkey: str):
+        """
+        Return the uid of `hotkey`, or None if it is not registered.
+        """
+        return self.uid_by_hotkey.get(hotkey)
+
+    def stake_of(self, hotkey: str) -> float:
+        """
+        Return the stake of `hotkey`, or 0.0 if it is not registered.
+        """
+        uid = self.uid_by_hotkey.get(hotkey)
+        return 0.0 if uid is None else self.stake[uid]
+
+
+class MetagraphSync:
+    """
+    Keeps a metagraph snapshot fresh in the background.
+
+    The chain is polled for the current block, and the metagraph is re-synced only once
+    it is more than `stale_blocks` behind. Callers read `snapshot` and `block` without
+    touching the chain, so they never wait on an RPC.
+    """
+
+    def __init__(self, subtensor: "bt.subtensor", netuid: int, metagraph: "bt.metagraph" = None, stale_blocks: int = 10, poll_interval: float = None):
+        """
+        Args:
+            subtensor (bt.subtensor): Chain connection used for block polls and syncs.
+            netuid (int): The subnet to follow.
+            metagraph (bt.metagraph, optional): An already synced metagraph used as the first snapshot.
+            stale_blocks (int): How many blocks the snapshot may fall behind before it is re-synced.
+            poll_interval (float, optional): Seconds between block polls, one block time by default.
+        """
+        self.subtensor = subtensor
+        self.netuid = netuid
+        self.stale_blocks = stale_blocks
+        self.poll_interval = bt.__blocktime__ if poll_interval is None else poll_interval
+        # The substrate connection is not safe to share between threads.
+        self.chain_lock = threading.Lock()
+        if metagraph is None:
+            metagraph = self._fetch()
+        self.snapshot = MetagraphSnapshot(metagraph)
+        self.block = self.snapshot.block
+        self.syncs = 0
+        self.sync_errors = 0
+
+    def _fetch(self) -> "bt.metagraph":
+        """
+        Sync a fresh metagraph from the chain. Runs in a worker thread.
+        """
+        metagraph = bt.metagraph(netuid = self.netuid, network = self.subtensor.network, sync = False)
+        with self.chain_lock:
+            # lite skips the weights and bonds matrices, which the validator never reads.
+            metagraph.sync(subtensor = self.subtensor, lite = True)
+        return metagraph
+
+    def _current_block(self) -> int:
+        with self.chain_lock:
+            return self.subtensor.block
+
+    async def run(self):
+        """
+        Poll the chain and swap in a new snapshot whenever the current one is stale, until cancelled.
+        """
+        loop = asyncio.get_event_loop()
+        while True:
+            try:
+                self.block = await loop.run_in_executor(None, self._current_block)
+                if self.block - self.snapshot.block >= self.stale_blocks:
+                    metagraph = await loop.run_in_executor(None, self._fetch)
+                    self.snapshot = MetagraphSnapshot(metagraph)
+                    self.syncs += 1
+                    bt.logging.info(f"🔄 Synced metagraph at block {self.snapshot.block}.")
+            except Exception as e:
+                self.sync_errors += 1
+                bt.logging.error(f"❌ Error syncing metagraph: {e}")
+                traceback.print_exc()
+            await asyncio.sleep(self.poll_interval)
@@ -25,11 +25,17 @@ import sys
 import time
 import argparse
 import traceback
+import concurrent.futures
 import bittensor as bt
 import scraping
 from typing import Tuple
 import torch
 from neurons.queries import get_query, QueryType, QueryProvider
+from neurons.cache import ResultCache, cache_key
+from neurons.prefetch import PrefetchScheduler
+from neurons.storage.local_store import LocalStore
+from neurons.metagraph_sync import MetagraphSnapshot
+from neurons.keywords import KeywordSampler
 from dotenv import load_dotenv
 import praw
 import reddit_scraper
@@ -45,6 +51,18 @@ def get_config():
     parser.add_argument( '--netuid', type = int, default = 3, help = "The chain subnet uid." )
     parser.add_argument( '--neuron.not_set_weights', type=bool, default = True, help = "miners can set weights.")
     parser.add_argument( '--auto-update', type = str, default = False, help = "Set to \"no\" to disable auto update.")
+    parser.add_argument( '--cache.max_entries', type = int, default = 256, help = "Maximum number of keywords kept in the scrape result cache.")
+    parser.add_argument( '--cache.ttl', type = float, default = 300, help = "Seconds a cached scrape result is served as fresh.")
+    parser.add_argument( '--cache.stale_ttl', type = float, default = 900, help = "Extra seconds a stale result is served while it is refreshed in the background.")
+    parser.add_argument( '--prefetch.enable', action = 'store_true', default = False, help = "Scrape the keyword list in the background. Twitter scrapes are paid actor runs.")
+    parser.add_argument( '--prefetch.interval', type = float, default = 30, help = "Seconds between prefetch scheduling ticks.")
+    parser.add_argument( '--prefetch.concurrency', type = int, default = 2, help = "Maximum number of background scrapes running at once.")
+    parser.add_argument( '--prefetch.max_per_tick', type = int, default = 1, help = "Maximum number of background scrapes started per prefetch tick.")
+    parser.add_argument( '--store.path', type = str, default = None, help = "Location of the local item database. Defaults to miner_store.db in the logging directory.")
+    parser.add_argument( '--store.retention_hours', type = float, default = 48, help = "Hours scraped items are kept in the local database.")
+    parser.add_argument( '--store.max_items', type = int, default = 200000, help = "Maximum number of items kept per source in the local database.")
+    parser.add_argument( '--store.watermark_overlap', type = float, default = 60, help = "Seconds before a keyword's newest stored item that incremental scrapes start from.")
+    parser.add_argument( '--miner.wait_timeout', type = float, default = 50, help = "Seconds a request waits for a scrape, its own or an identical one already running, before answering from stored items.")
     # Adds subtensor specific arguments i.e. --subtensor.chain_endpoint ... --subtensor.network ...
     bt.subtensor.add_args(parser)
     # Adds logging specific arguments i.e. --logging.debug ..., --logging.trace .. or --logging.logging_dir ...
@@ -70,19 +88,12 @@ def get_config():
     )
     # Ensure the directory for logging exists, else create one.
     if not os.path.exists(config.full_path): os.makedirs(config.full_path, exist_ok=True)
+    if config.store.path is None:
+        config.store.path = os.path.join(config.full_path, 'miner_store.db')
     return config
 
 # TODO: Add error handling for when the directory for logging cannot be created
 
-import random
-
-def random_line(a_file="keywords.txt"):
-    if not os.path.exists(a_file):
-        print(f"Keyword file not found at location: {a_file}")
-        quit()
-    lines = open(a_file).read().splitlines()
-    return random.choice(lines)
-
 
 # Main takes the config and starts the miner.
 def main( config ):
@@ -92,6 +103,58 @@ def main( config ):
     """
     twitter_query = get_query(QueryType.TWITTER, QueryProvider.TWEET_FLASH)
     # reddit_query = get_query(QueryType.REDDIT, QueryProvider.REDDIT_SCRAPER_LITE)
+    # Every scrape is written to the local database, and responses are the newest matching items held there.
+    local_store = LocalStore(config.store.path, retention_secs = config.store.retention_hours * 3600, max_items = config.store.max_items)
+
+    # Only items newer than the keyword's high-water mark are scraped; older ones are already stored.
+    # The mark is moved back a little so items indexed late by the source are not missed.
+    def since(source: str, keyword: str):
+        newest_at = local_store.watermark(source, keyword)
+        return None if newest_at is None else newest_at - config.store.watermark_overlap
+
+    def scrape_twitter(search_key: list) -> list:
+        keyword = search_key[0]
+        tweets = twitter_query.execute(search_key, 500, since = since("twitter", keyword))
+        # A scrape that filled its limit may have left older tweets behind.
+        local_store.ingest("twitter", tweets, keyword = keyword, complete = len(tweets) < 500)
+        return local_store.latest("twitter", keyword, 500)
+
+    def scrape_reddit(search_key: list) -> list:
+        keyword = search_key[0]
+        posts, complete = reddit_scraper.search(query=search_key, timeout=30, max_res=1000, max_posts=1000, max_comments=500, since=since("reddit", keyword))
+        local_store.ingest("reddit", posts, keyword = keyword, complete = complete)
+        return local_store.latest("reddit", keyword, 1000)
+
+    # Validators draw keywords from the same list, so recent results are cached per keyword.
+    keyword_sampler = KeywordSampler("keywords.txt")
+    result_cache = ResultCache(max_entries = config.cache.max_entries, ttl = config.cache.ttl, stale_ttl = config.cache.stale_ttl)
+
+    def serve(source: str, search_key: list, scrape, limit: int) -> list:
+        """
+        Return the cached result for `search_key`, scraping it on a miss for at most `config.miner.wait_timeout` seconds.
+
+        When the scrape takes longer, it keeps running and fills the cache, and this request is
+        answered with the last cached result or, failing that, the items already stored.
+        """
+        key = cache_key(source, search_key)
+        try:
+            return result_cache.get_or_fetch(key, lambda: scrape(search_key), timeout = config.miner.wait_timeout)
+        except concurrent.futures.TimeoutError:
+            cached = result_cache.get(key)
+            bt.logging.warning(f"{source} scrape for {search_key} did not finish in {config.miner.wait_timeout}s, answering from {'cache' if cached is not None else 'local store'}")
+            return cached if cached is not None else local_store.latest(source, search_key[0], limit)
+    # Keep every keyword warm in the cache so handlers rarely have to wait for a scrape.
+    prefetcher = PrefetchScheduler(
+        cache = result_cache,
+        fetchers = {
+            "twitter": lambda keyword: scrape_twitter([keyword]),
+            "reddit": lambda keyword: scrape_reddit([keyword]),
+        },
+        keywords = keyword_sampler.keywords,
+        interval = config.prefetch.interval,
+        concurrency = config.prefetch.concurrency,
+        max_per_tick = config.prefetch.max_per_tick,
+    )
     # Activating Bittensor's logging with the set configurations.
     bt.logging(config=config, logging_dir=config.full_path)
     bt.logging.info(f"Running miner for subnet: {config.netuid} on network: {config.subtensor.chain_endpoint} with config:")
@@ -123,15 +186,17 @@ def main( config ):
         bt.logging.info(f"Saved metagraph is old, syncing with subtensor")
 
     bt.logging.info(f"Metagraph: {metagraph}")
+    # Request handlers look callers up in the snapshot; it is rebuilt whenever the metagraph is refreshed.
+    snapshot = MetagraphSnapshot(metagraph)
 
     last_updated_block = subtensor.block - 100
 
-    if wallet.hotkey.ss58_address not in metagraph.hotkeys:
+    if not snapshot.is_registered(wallet.hotkey.ss58_address):
         bt.logging.error(f"\nYour miner: {wallet} is not registered to chain connection: {subtensor} \nRun btcli wallet register and try again. ")
         exit()
     else:
         # Each miner gets a unique identity (UID) in the network for differentiation.
-        my_subnet_uid = metagraph.hotkeys.index(wallet.hotkey.ss58_address)
+        my_subnet_uid = snapshot.uid_of(wallet.hotkey.ss58_address)
         bt.logging.info(f"Running miner on uid: {my_subnet_uid}")
 
     # Set up miner functionalities
@@ -143,13 +208,13 @@ def main( config ):
         requests before they are deserialized to avoid wasting resources on requests that will be ignored.
         Below: Check that the hotkey is a registered entity in the metagraph.
         """
-        if synapse.dendrite.hotkey not in metagraph.hotkeys:
+        if not snapshot.is_registered(synapse.dendrite.hotkey):
             # Ignore requests from unrecognized entities.
             bt.logging.trace(f'Blacklisting unrecognized hotkey {synapse.dendrite.hotkey}')
             return True, ""
         # are not validators, or do not have enough stake. This can be checked via metagraph.S
         # and metagraph.validator_permit. You can always attain the uid of the sender via a
-        # metagraph.hotkeys.index( synapse.dendrite.hotkey ) call.
+        # snapshot.uid_of( synapse.dendrite.hotkey ) call.
         # Otherwise, allow the request to be processed further.
         bt.logging.trace(f'Not Blacklisting recognized hotkey {synapse.dendrite.hotkey}')
         return False, ""
@@ -164,8 +229,7 @@ def main( config ):
         request should be processed later.
         Below: simple logic, prioritize requests from entities with more stake.
         """
-        caller_uid = metagraph.hotkeys.index( synapse.dendrite.hotkey ) # Get the caller index.
-        prirority = float( metagraph.S[ caller_uid ] ) # Return the stake as the priority.
+        prirority = snapshot.stake_of( synapse.dendrite.hotkey ) # Return the stake as the priority.
         bt.logging.trace(f'Prioritizing {synapse.dendrite.hotkey} with value: ', prirority)
         return prirority
     def blacklist_reddit( synapse: scraping.protocol.RedditScrap ) -> Tuple[bool, str]:
@@ -175,13 +239,13 @@ def main( config ):
         requests before they are deserialized to avoid wasting resources on requests that will be ignored.
         Below: Check that the hotkey is a registered entity in the metagraph.
         """
-        if synapse.dendrite.hotkey not in metagraph.hotkeys:
+        if not snapshot.is_registered(synapse.dendrite.hotkey):
             # Ignore requests from unrecognized entities.
             bt.logging.trace(f'Blacklisting unrecognized hotkey {synapse.dendrite.hotkey}')
             return True, ""
         # are not validators, or do not have enough stake. This can be checked via metagraph.S
         # and metagraph.validator_permit. You can always attain the uid of the sender via a
-        # metagraph.hotkeys.index( synapse.dendrite.hotkey ) call.
+        # snapshot.uid_of( synapse.dendrite.hotkey ) call.
         # Otherwise, allow the request to be processed further.
         bt.logging.trace(f'Not Blacklisting recognized hotkey {synapse.dendrite.hotkey}')
         return False, ""
@@ -196,8 +260,7 @@ def main( config ):
         request should be processed later.
         Below: simple logic, prioritize requests from entities with more stake.
         """
-        caller_uid = metagraph.hotkeys.index( synapse.dendrite.hotkey ) # Get the caller index.
-        prirority = float( metagraph.S[ caller_uid ] ) # Return the stake as the priority.
+        prirority = snapshot.stake_of( synapse.dendrite.hotkey ) # Return the stake as the priority.
         bt.logging.trace(f'Prioritizing {synapse.dendrite.hotkey} with value: ', prirority)
         return prirority
 
@@ -206,7 +269,10 @@ def main( config ):
         This function runs after the TwitterScrap synapse has been deserialized (i.e. after synapse.data is available).
         This function runs after the blacklist and priority functions have been called.
         """
-        validator_uid = metagraph.hotkeys.index( synapse.dendrite.hotkey )
+        validator_uid = snapshot.uid_of( synapse.dendrite.hotkey )
+        if validator_uid is None:
+            bt.logging.trace(f'Ignoring request from unregistered hotkey {synapse.dendrite.hotkey}')
+            return synapse
 
         # Version checking
         validator_version_str=None
@@ -226,12 +292,13 @@ def main( config ):
         if synapse.scrap_input is not None and len(synapse.scrap_input) > 0:
             search_key = synapse.scrap_input["search_key"]
         else:
-            search_key = [random_line()]
+            search_key = [keyword_sampler.sample()]
             bt.logging.info(f"picking random keyword: {search_key} \n")
+        prefetcher.record_request("twitter", search_key)
 
-        tweets = twitter_query.execute(search_key, 500, synapse.dendrite.hotkey, validator_version_str, my_subnet_uid)
+        tweets = serve("twitter", search_key, scrape_twitter, 500)
         synapse.version = scraping.utils.get_my_version()        
-        synapse.scrap_output = tweets
+        synapse.scrap_output = list(tweets)
         bt.logging.info(f"✅ success: returning {len(synapse.scrap_output)} tweets\n")
         return synapse
     
@@ -240,7 +307,10 @@ def main( config ):
         This function runs after the RedditScrap synapse has been deserialized (i.e. after synapse.data is available).
         This function runs after the blacklist and priority functions have been called.
         """
-        validator_uid = metagraph.hotkeys.index( synapse.dendrite.hotkey )
+        validator_uid = snapshot.uid_of( synapse.dendrite.hotkey )
+        if validator_uid is None:
+            bt.logging.trace(f'Ignoring request from unregistered hotkey {synapse.dendrite.hotkey}')
+            return synapse
 
         # Version checking
         validator_version_str=None
@@ -260,12 +330,12 @@ def main( config ):
         if synapse.scrap_input is not None and len(synapse.scrap_input) > 0:
             search_key = synapse.scrap_input["search_key"]
         else:
-            search_key = [random_line()]
+            search_key = [keyword_sampler.sample()]
             bt.logging.info(f"picking random keyword: {search_key} \n")
+        prefetcher.record_request("reddit", search_key)
         # Fetch latest N posts from miner's local database.
-        # posts = reddit_query.execute(search_key, 500, synapse.dendrite.hotkey, validator_version_str, my_subnet_uid)
-        posts = reddit_scraper.execute(query=search_key, timeout=30, max_res=1000, max_posts=1000)
-        synapse.scrap_output = posts
+        posts = serve("reddit", search_key, scrape_reddit, 1000)
+        synapse.scrap_output = list(posts)
         synapse.version = scraping.utils.get_my_version()        
         bt.logging.info(f"✅ success: returning {len(synapse.scrap_output)} reddit posts\n")
         return synapse
@@ -292,6 +362,9 @@ def main( config ):
     # Start  starts the miner's axon, making it active on the network.
     bt.logging.info(f"Starting axon server on port: {config.axon.port}")
     axon.start()
+
+    if config.prefetch.enable:
+        prefetcher.start()
     
     # Keep the miner alive
     # This loop maintains the miner's operations until intentionally stopped.
@@ -303,14 +376,8 @@ def main( config ):
                 bt.logging.trace(f"Setting miner weight")
                 # find the uid that matches config.wallet.hotkey [meta.axons[N].hotkey == config.wallet.hotkey]
                 # set the weight of that uid to 1.0
-                uid = None
                 try:
-                    for _uid, axon in enumerate(metagraph.axons):
-                        if axon.hotkey == wallet.hotkey.ss58_address:
-                            # uid = axon.uid
-                            # uid doesnt exist ona xon
-                            uid = _uid
-                            break
+                    uid = snapshot.uid_of(wallet.hotkey.ss58_address)
                     if uid is not None:
                         # 0 weights for all uids
                         weights = torch.Tensor([0.0] * len(metagraph.uids))
@@ -336,6 +403,9 @@ def main( config ):
                 if subtensor.block - metagraph.block.item() > 5:
                     bt.logging.info(f"Metagraph is old, syncing with subtensor")
                     metagraph = subtensor.metagraph(config.netuid)
+                snapshot = MetagraphSnapshot(metagraph)
+                if snapshot.uid_of(wallet.hotkey.ss58_address) is not None:
+                    my_subnet_uid = snapshot.uid_of(wallet.hotkey.ss58_address)
 
                 log =  (f'Step:{step} | '\
                         f'Block:{metagraph.block.item()} | '\
@@ -346,6 +416,11 @@ def main( config ):
                         f'Incentive:{metagraph.I[my_subnet_uid]} | '\
                         f'Emission:{metagraph.E[my_subnet_uid]}')
                 bt.logging.info(log)
+                bt.logging.info(f"Result cache: {result_cache.stats()} | Prefetch: {prefetcher.stats()}")
+
+                # Bound the local database's disk use.
+                pruned = local_store.prune()
+                bt.logging.info(f"Local store: {local_store.count()} items ({pruned} pruned)")
             
                 # Check for auto update
                 if config.auto_update != "no":
@@ -358,6 +433,7 @@ def main( config ):
 
         # If someone intentionally stops the miner, it'll safely terminate operations.
         except KeyboardInterrupt:
+            prefetcher.stop()
             axon.stop()
             bt.logging.success('Miner killed by keyboard interrupt.')
             break
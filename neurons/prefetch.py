@@ -0,0 +1,184 @@
+"""
+The MIT License (MIT)
+Copyright © 2023 Chris Wilson
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+the Software.
+
+THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+import math
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Union
+import bittensor as bt
+from neurons.cache import ResultCache, cache_key
+
+
+class PrefetchScheduler:
+    """
+    Keeps the miner's result cache warm by scraping every keyword in the background.
+
+    On every tick the scheduler ranks each (source, keyword) pair by how often validators
+    asked for it recently and how stale its cached data is, then scrapes the most urgent
+    pairs without exceeding its concurrency budget. Axon handlers then only pay for a
+    cache lookup.
+
+    Twitter scrapes are paid actor runs, and keywords that were never scraped rank as the most
+    stale, so a fresh cache is filled as fast as the budget allows: at most `max_per_tick`
+    scrapes start per tick.
+
+    Attributes:
+        interval (float): Seconds between scheduling ticks.
+        concurrency (int): Maximum number of scrapes running at once.
+        max_per_tick (int): Maximum number of scrapes started per tick.
+        demand_half_life (float): Seconds after which a recorded request counts half as much.
+    """
+
+    def __init__(
+        self,
+        cache: ResultCache,
+        fetchers: Dict[str, Callable[[str], object]],
+        keywords: Union[List[str], Callable[[], List[str]]],
+        interval: float = 30,
+        concurrency: int = 2,
+        max_per_tick: int = 1,
+        demand_half_life: float = 3600,
+    ):
+        """
+        Args:
+            cache (ResultCache): The cache the axon handlers read from.
+            fetchers (dict): Maps a source name to a function scraping one keyword.
+            keywords (list or Callable): The keywords to keep warm, or a function returning the current ones.
+        """
+        self.cache = cache
+        self.fetchers = fetchers
+        self.keywords = keywords
+        self.interval = interval
+        self.concurrency = concurrency
+        self.max_per_tick = max_per_tick
+        self.demand_half_life = demand_half_life
+
+        self._lock = threading.Lock()
+        self._demand = {}
+        self._running = set()
+        self._pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="prefetch")
+        self._stop = threading.Event()
+        self._thread = None
+
+        self.prefetched = 0
+        self.errors = 0
+
+    def record_request(self, source: str, search_key):
+        """
+        Record that a validator asked for `search_key` on `source`.
+        """
+        key = cache_key(source, search_key)
+        now = time.time()
+        with self._lock:
+            self._demand[key] = (self._decayed_demand(key, now) + 1, now)
+
+    def _decayed_demand(self, key, now: float) -> float:
+        count, updated_at = self._demand.get(key, (0.0, now))
+        return count * math.pow(0.5, (now - updated_at) / self.demand_half_life)
+
+    def priority(self, key, now: float = None) -> float:
+        """
+        Return how urgently `key` should be scraped. Zero means it is still fresh.
+        """
+        now = time.time() if now is None else now
+        age = self.cache.age(key)
+        if age < self.cache.ttl * 0.8:
+            return 0.0
+        staleness = min(age / self.cache.ttl, 10.0)
+        with self._lock:
+            demand = self._decayed_demand(key, now)
+        return staleness * (1.0 + demand)
+
+    def start(self):
+        """
+        Start the scheduling thread.
+        """
+        self._thread = threading.Thread(target=self._run, name="prefetch-scheduler", daemon=True)
+        self._thread.start()
+        bt.logging.info(f"Prefetching {len(self._keywords())} keywords for {list(self.fetchers)} every {self.interval}s")
+
+    def stop(self):
+        """
+        Stop scheduling new scrapes. Scrapes already running are left to finish.
+        """
+        self._stop.set()
+        self._pool.shutdown(wait=False)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.tick()
+            except Exception as e:
+                bt.logging.error(f"Prefetch tick failed: {e}")
+            self._stop.wait(self.interval)
+
+    def _keywords(self) -> List[str]:
+        return self.keywords() if callable(self.keywords) else self.keywords
+
+    def tick(self) -> int:
+        """
+        Schedule the most urgent scrapes that fit in the concurrency and per-tick budgets.
+
+        Returns:
+            int: The number of scrapes scheduled.
+        """
+        now = time.time()
+        candidates = []
+        for source in self.fetchers:
+            for keyword in self._keywords():
+                key = cache_key(source, [keyword])
+                with self._lock:
+                    if key in self._running:
+                        continue
+                score = self.priority(key, now)
+                if score > 0:
+                    candidates.append((score, source, keyword, key))
+
+        with self._lock:
+            budget = min(self.concurrency - len(self._running), self.max_per_tick)
+        candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+
+        scheduled = 0
+        for _, source, keyword, key in candidates[:max(budget, 0)]:
+            with self._lock:
+                self._running.add(key)
+            self._pool.submit(self._prefetch, source, keyword, key)
+            scheduled += 1
+        return scheduled
+
+    def _prefetch(self, source: str, keyword: str, key):
+        fetch = self.fetchers[source]
+        try:
+            self.cache.load(key, lambda: fetch(keyword))
+            self.prefetched += 1
+        except Exception as e:
+            self.errors += 1
+            bt.logging.warning(f"Prefetch of {source} '{keyword}' failed: {e}")
+        finally:
+            with self._lock:
+                self._running.discard(key)
+
+    def stats(self) -> dict:
+        """
+        Return counters describing the scheduler's work.
+        """
+        with self._lock:
+            running = len(self._running)
+        return {"running": running, "prefetched": self.prefetched, "errors": self.errors}
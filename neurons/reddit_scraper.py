@@ -1,78 +1,247 @@
 import praw
 import os
+import re
+import sys
 import time
-from datetime import datetime, timezone
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from neurons.timestamps import format_iso_millis
 from dotenv import load_dotenv
 import bittensor as bt
 
 load_dotenv()
-r_client = praw.Reddit(
-    client_id=os.getenv("REDDIT_CLIENT_ID"),
-    client_secret=os.getenv("REDDIT_CLIENT_SECRET"),
-    user_agent=os.getenv("REDDIT_USER_AGENT")
-)
 
-def convert_utc_timestamp_to_iso8601(timestamp_seconds):
-    # Convert timestamp to datetime object
-    dt_utc = datetime.utcfromtimestamp(timestamp_seconds).replace(tzinfo=timezone.utc)
+def make_client(**settings) -> praw.Reddit:
+    return praw.Reddit(
+        client_id=os.getenv("REDDIT_CLIENT_ID"),
+        client_secret=os.getenv("REDDIT_CLIENT_SECRET"),
+        user_agent=os.getenv("REDDIT_USER_AGENT"),
+        **settings
+    )
+
+r_client = make_client()
+
+# Listings are read on one long-lived pool, so every worker keeps its client, and the
+# client its OAuth token, from one scrape to the next.
+SEARCH_WORKERS = 8
+# Seconds a worker's HTTP request may take, which bounds how long a worker stays busy past a deadline.
+REQUEST_TIMEOUT = 10
+_search_pool = ThreadPoolExecutor(max_workers=SEARCH_WORKERS, thread_name_prefix="reddit-search")
+
+# praw clients are not thread safe, so each search worker thread gets its own.
+_thread_clients = threading.local()
 
-    # Format datetime object in ISO 8601 format
-    iso8601_format = dt_utc.strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+def thread_client() -> praw.Reddit:
+    client = getattr(_thread_clients, "client", None)
+    if client is None:
+        client = make_client(timeout=REQUEST_TIMEOUT)
+        _thread_clients.client = client
+    return client
 
-    return iso8601_format
+def convert_utc_timestamp_to_iso8601(timestamp_seconds):
+    # Format epoch seconds as ISO 8601 with milliseconds, e.g. '2023-11-20T10:00:00.000Z'
+    return format_iso_millis(timestamp_seconds)
 
 def map_results(results: list):
-    ret = [{
-        'id': f"t3_{item.id}",
-        'url': item.url,
-        'title': item.title,
-        'text': item.selftext,
-        'likes': item.score,
-        'dataType' : 'post',
-        'community' : item.subreddit.name,
-        'username' : item.author.name,
-        'parent' : None,
-        'timestamp' : convert_utc_timestamp_to_iso8601(int(item.created_utc))
-    } for item in results]
+    """
+    Map praw submissions and comments to the miner's reddit item format.
+
+    Only fields already present in the listing payload are read. Attributes such as
+    `item.subreddit.name` are lazy in praw and cost one extra Reddit API request per post.
+    """
+    ret = []
+    for item in results:
+        data = vars(item)
+        author = data.get('author')
+        entry = {
+            'id': data['name'],
+            'likes': data['score'],
+            'community' : data['subreddit_id'],
+            # praw builds the Redditor from the listing's author name, so str() does not fetch.
+            'username' : str(author) if author is not None else None,
+            'timestamp' : convert_utc_timestamp_to_iso8601(int(data['created_utc']))
+        }
+        if isinstance(item, praw.models.Comment):
+            entry.update({
+                'url': f"https://www.reddit.com{data['permalink']}",
+                'text': data['body'],
+                'dataType': 'comment',
+                'parent': data['parent_id'],
+            })
+        else:
+            entry.update({
+                'url': data['url'],
+                'title': data['title'],
+                'text': data['selftext'],
+                'dataType': 'post',
+                'parent': None,
+            })
+        ret.append(entry)
 
     return ret
 
-def execute(client : praw.Reddit = r_client, query : list = None, timeout : float = 30.0, max_res : int = 20, max_posts : int = 20, max_comments : int = 10):
-    print("testing...")
+# Listings searched for every keyword: site-wide search, and the newest posts and
+# comments of the subreddit named after the keyword.
+LISTINGS = ("search", "new", "comments")
+SUBREDDIT_NAME = re.compile(r"^\w{2,21}$")
 
-    # max_res = 1000
-    res = 0
-    posts = 0
+def listing(client : praw.Reddit, kind : str, keyword : str, limit : int):
+    if kind == "search":
+        return client.subreddit("all").search(query=keyword, sort="new", limit=limit)
+    if kind == "new":
+        return client.subreddit(keyword).new(limit=limit)
+    if kind == "comments":
+        return client.subreddit(keyword).comments(limit=limit)
+    raise ValueError(f"Unknown listing: {kind}")
+
+def is_relevant(item, keyword : str) -> bool:
+    data = vars(item)
+    keyword = keyword.lower()
+    return keyword in (data.get('title') or '').lower() or keyword in (data.get('selftext') or data.get('body') or '').lower()
+
+def execute(client : praw.Reddit = None, query : list = None, timeout : float = 30.0, max_res : int = 20, max_posts : int = 20, max_comments : int = 10, listings : tuple = LISTINGS, since : float = None):
+    """
+    Search reddit for the given keywords across several listings in parallel, see search().
+
+    Returns:
+        list: Mapped reddit posts and comments.
+    """
+    return search(client, query, timeout, max_res, max_posts, max_comments, listings, since)[0]
+
+def search(client : praw.Reddit = None, query : list = None, timeout : float = 30.0, max_res : int = 20, max_posts : int = 20, max_comments : int = 10, listings : tuple = LISTINGS, since : float = None):
+    """
+    Search reddit for the given keywords across several listings in parallel.
+
+    Every (keyword, listing) pair is read on the shared search pool. Results are
+    deduplicated by fullname and merged newest first. When `timeout` expires, whatever
+    was collected so far is returned: listings not started yet are cancelled, and running
+    ones stop at their next item or request timeout.
+
+    All listings are sorted newest first, so with `since` set a listing stops paging as
+    soon as it reaches an item that was already scraped.
+
+    Args:
+        client (praw.Reddit, optional): Client shared by all workers. By default each worker uses its own.
+        query (list): Keywords to search for.
+        timeout (float): Hard deadline in seconds.
+        max_res (int): Maximum number of items returned.
+        max_posts (int): Maximum number of posts read per listing, and returned overall.
+        max_comments (int): Maximum number of comments read per listing.
+        listings (tuple): Which listings to read, see LISTINGS.
+        since (float, optional): Epoch time of the newest item already held; older items are not read.
+
+    Returns:
+        tuple: The mapped reddit posts and comments, and whether they are complete: every
+            listing was read up to `since` or to its end, and no item was cut by the limits.
+    """
     start = time.time()
-    results = []
-
-    for post in client.subreddit("all").search(query=query[0], sort="new", limit=max_posts):
-        if res >= max_res: break
-        if posts >= max_posts: break
-        if time.time() - start >= timeout: break
-
-        num = 0
-        # for comment in post.comments:
-        #     if num >= max_comments: break
-        #     elif query.lower() in comment.body.lower():
-        #         results.append(comment)
-        #         num += 1
-        #         res += 1
-
-        if query[0].lower() in post.title.lower():
-            results.append(post)
+    deadline = start + timeout
+    stop = threading.Event()
+    lock = threading.Lock()
+    collected = {}
+
+    def read_listing(kind, keyword):
+        reddit = client or thread_client()
+        limit = max_comments if kind == "comments" else max_posts
+        read = 0
+        for item in listing(reddit, kind, keyword, limit):
+            if stop.is_set() or time.time() >= deadline: return False
+            if since is not None and vars(item)['created_utc'] < since: return True
+            read += 1
+            if is_relevant(item, keyword):
+                with lock:
+                    collected.setdefault(vars(item)['name'], item)
+        # A listing that filled its limit may have had more items.
+        return read < limit
+
+    tasks = [
+        (kind, keyword) for keyword in query for kind in listings
+        if kind == "search" or SUBREDDIT_NAME.match(keyword)
+    ]
+    futures = {_search_pool.submit(read_listing, kind, keyword): (kind, keyword) for kind, keyword in tasks}
+    done, not_done = wait(futures, timeout=max(deadline - time.time(), 0))
+    stop.set()
+    for future in not_done:
+        future.cancel()
+
+    complete = len(not_done) == 0
+    for future in done:
+        if future.exception() is not None:
+            bt.logging.debug(f"Listing {futures[future]} failed: {future.exception()}")
+            complete = False
+        elif not future.result():
+            complete = False
+    if len(not_done) > 0:
+        bt.logging.debug(f"Deadline reached with {len(not_done)} listings unfinished")
+
+    with lock:
+        results = sorted(collected.values(), key=lambda item: vars(item)['created_utc'], reverse=True)
+
+    posts = 0
+    merged = []
+    for item in results:
+        if len(merged) >= max_res:
+            complete = False
+            break
+        if not isinstance(item, praw.models.Comment):
+            if posts >= max_posts:
+                complete = False
+                continue
             posts += 1
-            res += 1
-        # print(f"---=== {submission.title} ===---")
-        # print(f"written by: {submission.author}")
-        if time.time() - start >= timeout: break
+        merged.append(item)
 
     end = time.time()
     bt.logging.debug(f"SCRAPED IN: {end - start}s")
-    bt.logging.debug(f"NUMBER OF RESULTS: {len(results)}")
+    bt.logging.debug(f"NUMBER OF RESULTS: {len(merged)}")
+
+    return map_results(merged), complete
+
+class count_requests:
+    """
+    Context manager counting the HTTP requests a praw client sends.
+    """
+    def __init__(self, client : praw.Reddit):
+        self.session = client._core._requestor._http
+        self.count = 0
+
+    def __enter__(self):
+        self._request = self.session.request
+        def request(*args, **kwargs):
+            self.count += 1
+            return self._request(*args, **kwargs)
+        self.session.request = request
+        return self
+
+    def __exit__(self, *exc):
+        self.session.request = self._request
+        return False
+
+
+def benchmark_map_results(client : praw.Reddit = r_client, query : str = "btc", max_posts : int = 1000):
+    """
+    Compare the HTTP requests spent mapping `max_posts` posts with lazy praw attributes
+    (the previous mapping) against mapping from the listing payload.
+    """
+    with count_requests(client) as listing:
+        posts = list(client.subreddit("all").search(query=query, sort="new", limit=max_posts))
+
+    with count_requests(client) as payload:
+        map_results(posts)
+
+    # Fresh objects, so nothing fetched above is reused.
+    posts = list(client.subreddit("all").search(query=query, sort="new", limit=max_posts))
+    with count_requests(client) as lazy:
+        [(item.subreddit.name, item.author.name if item.author else None) for item in posts]
+
+    per_1000 = lambda count: count * 1000 / max(len(posts), 1)
+    print(f"listing: {listing.count} requests for {len(posts)} posts")
+    print(f"lazy attribute mapping: {per_1000(lazy.count):.0f} requests per 1000 results")
+    print(f"payload mapping: {per_1000(payload.count):.0f} requests per 1000 results")
 
-    return map_results(results)
 
 if __name__ == "__main__":
-    res = execute(client=r_client, query=["btc"], max_res=500, max_posts=500)
-    print(res[0])
+    if "--benchmark" in sys.argv:
+        benchmark_map_results()
+    else:
+        res = execute(query=["btc"], max_res=500, max_posts=500)
+        print(res[0])
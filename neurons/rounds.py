@@ -0,0 +1,113 @@
+"""
+The MIT License (MIT)
+Copyright © 2023 Chris Wilson
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+the Software.
+
+THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+import asyncio
+import traceback
+from typing import Awaitable, Callable, List
+import bittensor as bt
+
+
+class RoundSpec:
+    """
+    Describes one kind of validator query round, e.g. Twitter or Reddit.
+
+    Attributes:
+        name (str): Round name used in logs.
+        interval (float): Seconds between the starts of two rounds of this kind.
+        concurrency (int): Maximum number of rounds of this kind running at once.
+        synapse (Callable): Builds the synapse to send from a search key.
+        scorer (Callable): Scoring function with the calculateScore(responses, tag, history) signature.
+        alpha (float): EMA factor applied to the miners' previous scores.
+    """
+
+    def __init__(self, name: str, interval: float, concurrency: int, synapse: Callable, scorer: Callable, alpha: float):
+        self.name = name
+        self.interval = interval
+        self.concurrency = concurrency
+        self.synapse = synapse
+        self.scorer = scorer
+        self.alpha = alpha
+
+
+class RoundScheduler:
+    """
+    Runs several kinds of query rounds side by side on one event loop.
+
+    Each kind of round is started on its own cadence, and at most `concurrency` rounds of
+    a kind run at once. Miners taking part in a running round are reserved so concurrent
+    rounds query different subsets of the network.
+    """
+
+    def __init__(self, specs: List[RoundSpec], run_round: Callable[[RoundSpec], Awaitable[None]]):
+        """
+        Args:
+            specs (list): The kinds of rounds to run.
+            run_round (Callable): Coroutine function executing one round of the given kind.
+        """
+        self.specs = specs
+        self.run_round = run_round
+        self.busy_uids = set()
+        self.started = {spec.name: 0 for spec in specs}
+        self.running = {spec.name: 0 for spec in specs}
+        # The event loop only keeps weak references to tasks, so running rounds are held here.
+        self._tasks = set()
+
+    def reserve(self, uids: List[int]):
+        """
+        Mark `uids` as taking part in a running round.
+        """
+        self.busy_uids.update(uids)
+
+    def release(self, uids: List[int]):
+        """
+        Make `uids` available to other rounds again.
+        """
+        self.busy_uids.difference_update(uids)
+
+    async def run(self):
+        """
+        Run every kind of round until cancelled.
+        """
+        await asyncio.gather(*(self._schedule(spec) for spec in self.specs))
+
+    async def _schedule(self, spec: RoundSpec):
+        slots = asyncio.Semaphore(spec.concurrency)
+        while True:
+            await slots.acquire()
+            self.started[spec.name] += 1
+            self.running[spec.name] += 1
+            task = asyncio.ensure_future(self._run_one(spec, slots))
+            self._tasks.add(task)
+            task.add_done_callback(self._round_done)
+            await asyncio.sleep(spec.interval)
+
+    def _round_done(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            bt.logging.error(f"❌ Round task failed: {task.exception()}")
+
+    async def _run_one(self, spec: RoundSpec, slots: asyncio.Semaphore):
+        try:
+            await self.run_round(spec)
+        except Exception as e:
+            bt.logging.error(f"❌ Error in {spec.name} round: {e}")
+            traceback.print_exc()
+        finally:
+            self.running[spec.name] -= 1
+            slots.release()
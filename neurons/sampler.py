@@ -0,0 +1,175 @@
+"""
+The MIT License (MIT)
+Copyright © 2023 Chris Wilson
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+the Software.
+
+THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+import time
+import math
+import random
+from typing import List
+
+
+class MinerStats:
+    """
+    What the validator knows about one uid's scores: when it was last scored, how much its round
+    scores vary and how its spot checks went.
+    """
+
+    def __init__(self, hotkey: str):
+        self.hotkey = hotkey
+        self.last_scored = None
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.clean = 0.0
+        self.failed = 0.0
+
+    def observe(self, score: float, when: float):
+        # Welford's online mean and variance.
+        self.count += 1
+        delta = score - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (score - self.mean)
+        self.last_scored = when if self.last_scored is None else max(self.last_scored, when)
+
+    def observe_checks(self, checked: int, failed: int, decay: float):
+        # Older rounds count for less, so a miner can recover from a failed check.
+        self.clean = decay * self.clean + checked - failed
+        self.failed = decay * self.failed + failed
+
+    def uncertainty(self) -> float:
+        """
+        Return the standard error of the mean round score, 1.0 for uids scored fewer than twice.
+        """
+        if self.count < 2:
+            return 1.0
+        return math.sqrt(self.m2 / (self.count - 1) / self.count)
+
+
+class CoverageSampler:
+    """
+    Picks the miners of the next round so that every miner is scored regularly.
+
+    Miners that were never scored come first. Then miners not scored for at least
+    `min_revisit` seconds are ranked by staleness (in units of `min_revisit`) plus the
+    uncertainty of their score, with a little jitter so ties do not always resolve the same
+    way. Miners scored more recently than `min_revisit` are only picked to fill a round,
+    least recently scored first.
+    """
+
+    def __init__(self, min_revisit: float = 600, uncertainty_weight: float = 1.0, jitter: float = 0.1, check_decay: float = 0.9):
+        """
+        Args:
+            min_revisit (float): Seconds before a scored miner is preferred again.
+            uncertainty_weight (float): Weight of score uncertainty relative to staleness.
+            jitter (float): Amplitude of the random term added to each priority.
+            check_decay (float): Factor applied to a miner's spot check counts at each new round.
+        """
+        self.min_revisit = min_revisit
+        self.uncertainty_weight = uncertainty_weight
+        self.jitter = jitter
+        self.check_decay = check_decay
+        self.started = time.time()
+        self.miners = {}
+
+    def _stats(self, uid: int, hotkey: str) -> MinerStats:
+        # A new hotkey on the uid starts its history afresh.
+        stats = self.miners.get(uid)
+        if stats is None or stats.hotkey != hotkey:
+            stats = self.miners[uid] = MinerStats(hotkey)
+        return stats
+
+    def observe(self, uid: int, hotkey: str, score: float, when: float = None):
+        """
+        Record a round score of `uid`. A new hotkey on the uid starts its history afresh.
+        """
+        self._stats(uid, hotkey).observe(float(score), time.time() if when is None else when)
+
+    def observe_checks(self, uid: int, hotkey: str, checked: int, failed: int):
+        """
+        Record how many of `uid`'s items were spot-checked in a round and how many failed.
+        """
+        self._stats(uid, hotkey).observe_checks(checked, failed, self.check_decay)
+
+    def check_history(self, uid: int, hotkey: str) -> tuple:
+        """
+        Return the decayed (clean, failed) spot check counts of `uid`, (0.0, 0.0) for a new miner.
+        """
+        stats = self.miners.get(uid)
+        if stats is None or stats.hotkey != hotkey:
+            return (0.0, 0.0)
+        return (stats.clean, stats.failed)
+
+    def sync(self, hotkeys: List[str]) -> List[int]:
+        """
+        Forget the uids now held by another hotkey, or no longer in the metagraph, so a newly
+        registered miner starts with no coverage or spot check record.
+
+        Returns:
+            list: The uids forgotten.
+        """
+        stale = [uid for uid, stats in self.miners.items() if uid >= len(hotkeys) or stats.hotkey != hotkeys[uid]]
+        for uid in stale:
+            del self.miners[uid]
+        return stale
+
+    def since_scored(self, uid: int, now: float = None) -> float:
+        """
+        Return the seconds since `uid` was last scored, counting from startup if it never was.
+        """
+        now = time.time() if now is None else now
+        stats = self.miners.get(uid)
+        if stats is None or stats.last_scored is None:
+            return now - self.started
+        return now - stats.last_scored
+
+    def select(self, candidates: List[int], k: int) -> List[int]:
+        """
+        Return up to `k` of `candidates` to query next.
+        """
+        now = time.time()
+        unseen, due, recent = [], [], []
+        for uid in candidates:
+            stats = self.miners.get(uid)
+            if stats is None or stats.last_scored is None:
+                unseen.append(uid)
+                continue
+            staleness = now - stats.last_scored
+            if staleness >= self.min_revisit:
+                priority = staleness / self.min_revisit + self.uncertainty_weight * stats.uncertainty() + random.uniform(0, self.jitter)
+                due.append((priority, uid))
+            else:
+                recent.append((staleness, uid))
+
+        random.shuffle(unseen)
+        due.sort(reverse=True)
+        recent.sort(reverse=True)
+        ranked = unseen + [uid for _, uid in due] + [uid for _, uid in recent]
+        return ranked[:k]
+
+    def coverage(self, uids: List[int]) -> dict:
+        """
+        Return the maximum and median seconds since the given uids were last scored, and how many never were.
+        """
+        if len(uids) == 0:
+            return {"max_since_scored": None, "median_since_scored": None, "never_scored": 0}
+        now = time.time()
+        since = sorted(self.since_scored(uid, now) for uid in uids)
+        middle = len(since) // 2
+        median = since[middle] if len(since) % 2 else (since[middle - 1] + since[middle]) / 2
+        never = sum(1 for uid in uids if uid not in self.miners)
+        return {"max_since_scored": round(since[-1], 1), "median_since_scored": round(median, 1), "never_scored": never}
@@ -17,4 +17,20 @@ OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE S
 DEALINGS IN THE SOFTWARE.
 """
 from . import twitter_score
-from . import reddit_score
\ No newline at end of file
+from . import reddit_score
+# Configuration goes to the modules the scorers import, whichever name this package was loaded under.
+from neurons.score import verification_cache, verification_plan
+
+
+def configure(cache: dict = None, planner: dict = None):
+    """
+    Set up spot-check verification in a scoring process. Scoring pools run this in each worker.
+
+    Args:
+        cache (dict, optional): VerificationCache arguments: path, ttl and max_entries.
+        planner (dict, optional): VerificationPlanner arguments.
+    """
+    if cache is not None:
+        verification_cache.configure(**cache)
+    if planner is not None:
+        verification_plan.configure(**planner)
@@ -0,0 +1,219 @@
+"""
+The MIT License (MIT)
+Copyright © 2023 Chris Wilson
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+the Software.
+
+THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+import time
+from array import array
+from typing import Callable, List
+import torch
+import bittensor as bt
+
+
+def column(values: list, typecode: str, dtype: torch.dtype) -> torch.Tensor:
+    """
+    Build a tensor from a long list of Python numbers through an array, which converts them several times faster than torch.tensor.
+    """
+    if len(values) == 0:
+        return torch.tensor([], dtype=dtype)
+    return torch.frombuffer(array(typecode, values), dtype=dtype)
+
+
+class Columns:
+    """
+    All items of one round flattened into parallel columns, plus per-miner flags.
+
+    Attributes:
+        miner (torch.Tensor): Index of the response each item came from.
+        item_id (torch.Tensor): 64 bit hash of each item's id.
+        timestamp (torch.Tensor): Each item's creation time in epoch seconds.
+        relevant (torch.Tensor): 1.0 for items mentioning the round's keyword.
+        length (torch.Tensor): Number of items in each response, malformed ones included.
+        format (torch.Tensor): 1.0 for responses that were missing or had a malformed item.
+        fake (torch.Tensor): 1.0 for responses with duplicated or forged items.
+    """
+
+    def __init__(self, miner: list, item_id: list, timestamp: list, relevant: list, length: list, format: list, fake: list):
+        self.miner = column(miner, 'q', torch.int64)
+        self.item_id = column(item_id, 'q', torch.int64)
+        self.timestamp = column(timestamp, 'd', torch.float64)
+        self.relevant = column(relevant, 'd', torch.float64)
+        self.length = torch.tensor(length, dtype=torch.float32)
+        self.format = torch.tensor(format, dtype=torch.float32)
+        self.fake = torch.tensor(fake, dtype=torch.float32)
+
+    def __len__(self) -> int:
+        return len(self.length)
+
+
+def flatten(responses: list, tag: str, read_items: Callable, timestamps: Callable) -> Columns:
+    """
+    Validate every item once and flatten the round into columns.
+
+    The whole round is read in one call, one list per field, so the cost is a few list
+    comprehensions over all items rather than a function call per item, and the reader can
+    share work between the many items miners have in common. Only when that call fails is
+    the round read again response by response, and a failing response item by item, to
+    drop the malformed items.
+
+    Missing responses are replaced by empty lists in place and flagged as format errors,
+    as the scorers always did.
+
+    Args:
+        responses (list): The miners' responses.
+        tag (str): The round's keyword.
+        read_items (Callable): Returns (ids, forged, relevant, timestamps) lists for a list of
+            items and the lowercased keyword, raising if any item is malformed.
+        timestamps (Callable): Converts a list of timestamps to epoch seconds, None for
+            those it cannot parse.
+
+    Returns:
+        Columns: The flattened round.
+    """
+    tag = tag.lower()
+    format = []
+    for i, response in enumerate(responses):
+        if response is None:
+            responses[i] = []
+            format.append(1.0)
+        else:
+            format.append(0.0)
+    length = [len(response) for response in responses]
+
+    def read(items):
+        ids, forged, relevant, raw_timestamp = read_items(items, tag)
+        return list(map(hash, ids)), forged, relevant, raw_timestamp
+
+    try:
+        counts = length
+        item_id, forged, relevant, raw_timestamp = read([item for response in responses for item in response])
+    except Exception:
+        counts, item_id, forged, relevant, raw_timestamp = [], [], [], [], []
+        for i, response in enumerate(responses):
+            try:
+                columns = [read(response)]
+            except Exception:
+                columns = []
+                for item in response:
+                    try:
+                        columns.append(read([item]))
+                    except Exception as e:
+                        bt.logging.info(f"❌ Bad format for item: {e}, {item}")
+                        format[i] = 1.0
+            counts.append(0)
+            for ids, forged_items, relevant_items, item_timestamps in columns:
+                counts[i] += len(ids)
+                item_id += ids
+                forged += forged_items
+                relevant += relevant_items
+                raw_timestamp += item_timestamps
+
+    miner, fake, start = [], [], 0
+    for i, count in enumerate(counts):
+        end = start + count
+        ids = item_id[start:end]
+        fake.append(1.0 if any(forged[start:end]) or len(set(ids)) < count else 0.0)
+        miner += [i] * count
+        start = end
+
+    # Timestamps are converted as one batch so the conversion can share work across items.
+    epoch = timestamps(raw_timestamp)
+    if None in epoch:
+        for position, seconds in enumerate(epoch):
+            if seconds is None:
+                format[miner[position]] = 1.0
+                epoch[position] = 0.0
+    return Columns(miner, item_id, epoch, relevant, length, format, fake)
+
+
+def score(columns: Columns, correct: List[float], now: float = None) -> dict:
+    """
+    Score a flattened round.
+
+    Every miner is scored on four components, each normalized by the best miner of the round:
+    similarity (how many of its items other miners also returned, lower is better), freshness,
+    length and relevance. Miners that failed the spot check, returned malformed, forged or
+    duplicated items, mostly irrelevant items or nothing at all are zeroed. The remaining
+    scores are normalized to sum to one.
+
+    Args:
+        columns (Columns): The flattened round.
+        correct (list): 1 for each miner whose spot-checked item was verified, 0 otherwise.
+        now (float, optional): Current time in epoch seconds, time.time() by default.
+
+    Returns:
+        dict: The scoring metrics, one tensor per metric with one value per miner.
+    """
+    n = len(columns)
+    now = time.time() if now is None else now
+
+    # How many times each item was returned across the round, minus the item itself.
+    _, inverse, counts = torch.unique(columns.item_id, return_inverse=True, return_counts=True)
+    shared = (counts[inverse] - 1).to(torch.float64)
+    similarity_list = torch.zeros(n, dtype=torch.float64).index_add_(0, columns.miner, shared)
+
+    # The age of each item in whole seconds. Items dated in the future count as brand new.
+    age = torch.floor(now - columns.timestamp).clamp(min=0)
+    time_diff_list = torch.zeros(n, dtype=torch.float64).index_add_(0, columns.miner, age)
+
+    relevant_count = torch.zeros(n, dtype=torch.float64).index_add_(0, columns.miner, columns.relevant)
+    length_list = columns.length
+    relevant_ratio = torch.where(length_list > 0, relevant_count.float() / length_list.clamp(min=1), torch.zeros(n))
+    correct_list = torch.tensor(correct, dtype=torch.float32)
+
+    max_similar_count = max(similarity_list.max().item(), 0)
+    max_time_diff = max(time_diff_list.max().item(), 0)
+    max_correct_score = max(correct_list.max().item(), 0)
+    max_length = max(length_list.max().item(), 0)
+
+    similarity_list = ((similarity_list + 1) / (max_similar_count + 1)).float()
+    time_diff_list = ((time_diff_list + 1) / (max_time_diff + 1)).float()
+    correct_list = (correct_list + 1) / (max_correct_score + 1)
+    length_normalized = (length_list + 1) / (max_length + 1)
+
+    time_diff_contribution = (1 - time_diff_list) * 0.2
+    length_contribution = length_normalized * 0.3
+    similarity_contribution = (1 - similarity_list) * 0.3
+    relevancy_contribution = relevant_ratio * 0.2
+
+    score_list = (similarity_contribution + time_diff_contribution + length_contribution + relevancy_contribution)
+    pre_filtered_score = score_list.clone()
+
+    rejected = (correct_list < 1) | (columns.format == 1) | (columns.fake == 1) | (relevant_ratio < 0.5) | (length_list == 0)
+    score_list = torch.where(rejected, torch.zeros(n), score_list)
+    filtered_scores = score_list.clone()
+
+    if torch.sum(score_list) == 0:
+        normalized_scores = score_list
+    else:
+        normalized_scores = score_list / torch.sum(score_list)
+
+    return {
+        "correct": correct_list,
+        "similarity": similarity_list,
+        "time_diff": time_diff_list,
+        "time_contrib": time_diff_contribution,
+        "length": length_list,
+        "length_contrib": length_contribution,
+        "similarity_contrib": similarity_contribution,
+        "relevancy_contrib": relevancy_contribution,
+        "format": columns.format,
+        "fake": columns.fake,
+        "pre_filtered_score": pre_filtered_score,
+        "filtered_scores": filtered_scores,
+        "normalized_scores": normalized_scores,
+    }
+
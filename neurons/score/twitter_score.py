@@ -19,17 +19,25 @@ DEALINGS IN THE SOFTWARE.
 
 # importing necessary libraries and modules
 
-import torch
-import datetime
-import random
+import time
+import math
+import asyncio
 import bittensor as bt
+from collections import deque
 from urllib.parse import urlparse
 import os
 import re
 import html
+from functools import lru_cache
 from neurons.queries import get_query, QueryType, QueryProvider
+from neurons.score import engine
+from neurons.timestamps import to_epochs
+from neurons.score.verification_cache import get_cache
+from neurons.score import verification_plan
 
 twitter_query = get_query(QueryType.TWITTER, QueryProvider.TWEET_FLASH)
+# Second provider for hedged and retried lookups.
+fallback_query = get_query(QueryType.TWITTER, QueryProvider.WEB_HARVESTER_TWITTER_SCRAPER)
 
 from itertools import islice
 
@@ -51,234 +59,222 @@ def text_for_comparison(text):
 
 
 
-def calculateScore(responses = [], tag = 'tao'):
+PLAIN_URL = re.compile(r"https?://[^/;?#]+/[^;?#]*")
+
+
+@lru_cache(maxsize=65536)
+def url_last_component(url):
+    # Get the last component of the path of the URL
+    if PLAIN_URL.fullmatch(url):
+        # No params, query or fragment: the path is everything after the host.
+        return url.rsplit('/', 1)[1]
+    return os.path.basename(urlparse(url).path)
+
+
+def read_tweets(tweets, tag):
+    """
+    Return the tweets' ids, whether each url was forged, whether each mentions `tag` and their timestamps, one list per field.
+    Raises if a required field is missing.
+    """
+    ids = [tweet['id'] for tweet in tweets]
+    urls = [tweet['url'] for tweet in tweets]
+    timestamps = [tweet['timestamp'] for tweet in tweets]
+    relevant = [tag in tweet['text'].lower() for tweet in tweets]
+    # Miners return many of the same tweets, so each distinct url is parsed once.
+    last = {url: url_last_component(url) for url in set(urls)}
+    forged = [last[url] != tweet_id for url, tweet_id in zip(urls, ids)]
+    if any(forged):
+        for bad, tweet_id, url in zip(forged, ids, urls):
+            if bad:
+                if not isinstance(tweet_id, str):
+                    raise TypeError(f"tweet id must be a string, not {type(tweet_id).__name__}")
+                bt.logging.info(f"id/url mismatch detected: {url}")
+    return ids, forged, relevant, timestamps
+
+
+def fetch_tweets(urls: list, batch_size: int = 20, concurrency: int = 4, deadline: float = 40, hedge_after: float = 20, retries: int = 1, max_calls: int = None) -> tuple:
+    """
+    Fetch tweets by url in concurrent batches, under a hard deadline.
+
+    The urls are split into batches up front and at most `concurrency` lookups run at
+    once on each provider. A primary lookup still running after `hedge_after` seconds is
+    duplicated on the fallback provider. Urls missing from a finished lookup are retried,
+    up to `retries` times, on both providers at once. Hedges and retries are only sent while
+    the calls made so far, plus the batches not yet sent, stay below `max_calls`. Whatever
+    was fetched when `deadline` passes is returned; lookups still running then, or made
+    redundant by another lookup, are cancelled, which aborts their actor runs.
+
+    Args:
+        urls (list): Tweet urls to fetch.
+        batch_size (int): Urls per provider call.
+        concurrency (int): Maximum number of calls running at once on each provider.
+        deadline (float): Seconds after which the verification phase ends.
+        hedge_after (float): Seconds after which a slow primary call is also sent to the fallback provider.
+        retries (int): How many times a missing url is retried.
+        max_calls (int, optional): Provider calls the hedges and retries may bring the total to.
+
+    Returns:
+        tuple: The fetched tweets, at most one per tweet id, and the number of provider calls made.
+    """
+    return asyncio.run(_fetch_tweets(urls, batch_size, concurrency, deadline, hedge_after, retries, max_calls))
+
+
+async def _fetch_tweets(urls: list, batch_size: int, concurrency: int, deadline: float, hedge_after: float, retries: int, max_calls: int) -> tuple:
+    end = time.time() + deadline
+    providers = {"primary": twitter_query, "fallback": fallback_query}
+    found = {}
+    retried = {url: 0 for url in urls}
+    # Queued lookups are (provider, urls, extra); extra lookups are the hedges and retries.
+    queue = deque(("primary", list(batch), False) for batch in chunk(urls, batch_size))
+    unsent = len(queue)
+    calls = 0
+    running = {}
+    hedged = set()
+
+    def missing(batch):
+        return [url for url in batch if url_last_component(url) not in found]
+
+    try:
+        while (queue or running) and time.time() < end:
+            # Each provider gets its own slots, so hedges are not stuck behind slow primaries.
+            busy = [name for name, _, _ in running.values()]
+            for _ in range(len(queue)):
+                name, batch, extra = queue.popleft()
+                batch = missing(batch)
+                if extra and max_calls is not None and calls + unsent >= max_calls:
+                    # Out of budget: the batches not yet sent come first.
+                    continue
+                if len(batch) == 0:
+                    unsent -= not extra
+                    continue
+                if busy.count(name) >= concurrency:
+                    queue.append((name, batch, extra))
+                    continue
+                busy.append(name)
+                calls += 1
+                unsent -= not extra
+                running[asyncio.ensure_future(providers[name].searchByUrlAsync(batch))] = (name, batch, time.time())
+            if len(running) == 0:
+                break
+
+            done, _ = await asyncio.wait(running, timeout=max(min(1.0, end - time.time()), 0), return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                name, batch, _ = running.pop(task)
+                try:
+                    tweets = task.result()
+                except Exception as e:
+                    bt.logging.error(f"❌ Error while verifying post ({name}): {e}")
+                    tweets = []
+                for tweet in tweets:
+                    found.setdefault(str(tweet['id']), tweet)
+                bt.logging.info(f"Fetched {len(batch) - len(missing(batch))}/{len(batch)} tweets ({name}).")
+
+                retry = [url for url in missing(batch) if retried[url] < retries]
+                if len(retry) > 0:
+                    for url in retry:
+                        retried[url] += 1
+                    queue.append(("primary", retry, True))
+                    queue.append(("fallback", retry, True))
+
+            now = time.time()
+            for task, (name, batch, started) in list(running.items()):
+                if len(missing(batch)) == 0:
+                    # Another lookup already returned every tweet of this one.
+                    del running[task]
+                    task.cancel()
+                elif name == "primary" and task not in hedged and now - started >= hedge_after:
+                    hedged.add(task)
+                    queue.appendleft(("fallback", batch, True))
+    finally:
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+
+    return list(found.values()), calls
+
+
+def matches(sample_item: dict, searched_item: dict) -> bool:
+    """
+    Return whether a miner's tweet agrees with the tweet fetched from the provider.
+    """
+    # Normalize text to account for variations in scraped data.
+    miner_text = text_for_comparison(sample_item['text'])
+    verify_text = text_for_comparison(searched_item['text'])
+
+    # Some sources truncate time to the nearest minute.
+    # timestamp format is '2011-04-25 16:55:15+00:00', so drop the last
+    miner_timestamp = sample_item['timestamp'][:16]
+    verify_timestamp = searched_item['timestamp'][:16]
+
+    if(verify_text == miner_text and verify_timestamp == miner_timestamp):
+        return True
+    bt.logging.info(f"Tampered tweet! {sample_item}")
+    bt.logging.info(f"Original tweet: {searched_item}")
+    return False
+
+
+def calculateScore(responses = [], tag = 'tao', history = None):
     """
     This function calculates the score of responses.
     The score is calculated by the degree of similarity between responses, accuracy and time difference.
     Args:
         responses (list): The list of responses.
         tag (str): The tag of responses.
+        history (list, optional): (clean, failed) spot check counts of each miner from earlier rounds.
     Returns:
         list: The list of scores for each response.
     """
     if len(responses) == 0:
         return []
-    
-    # Initialize variables
-    # Initialize score list. The length of score list is the same as the length of responses.
-    score_list = torch.zeros(len(responses))
-    # Initialize time difference list. The length of time difference list is the same as the length of responses.
-    time_diff_list = torch.zeros(len(responses))
-
-    correct_score = 0
-    max_correct_score = 0
-    max_time_diff = 0
-    # Initialize accuracy list. The length of accuracy list is the same as the length of responses.
-    accuracy_list = torch.zeros(len(responses))
-    # Initialize similarity list. The length of similarity list is the same as the length of responses.
-    similarity_list = torch.zeros(len(responses))
-    max_similar_count = 0
-    # Initialize length list. The length score list is the same as the length of responses.
-    length_list = torch.zeros(len(responses))
-    correct_list = torch.ones(len(responses))
-    total_length = 0
-    max_length = 0
-    relevant_ratio = torch.zeros(len(responses))
-
-    format_score = torch.zeros(len(responses))
-    fake_score = torch.zeros(len(responses))
-    
-    # Count the number of occurrences of each ID
-    id_counts = {}
-    for i, response in enumerate(responses):
-
-        if response == None:
-            responses[i] = []
-            response = []
-            format_score[i] = 1
-        id_list = []
-        for tweet in response:
-            try:
-                # Check that 'text' and 'timestamp' fields exist
-                tweet['text'] and tweet['timestamp']
-                if tweet['id'] in id_list or tweet['id'] not in tweet['url']:
-                    fake_score[i] = 1
-                else:
-                    id_list.append(tweet['id'])
-                
-                parsed_url = urlparse(tweet['url'])
-                # Extract the path from the URL 
-                path = parsed_url.path
-                # Get the last component of the path
-                last_component = os.path.basename(path)
-                if last_component != tweet['id']:
-                    bt.logging.info(f"id/url mismatch detected: {tweet['url']}")
-                    fake_score[i] = 1
-
-                tweet_id = tweet['id']
-                if tweet_id in id_counts:
-                    id_counts[tweet_id] += 1
-                else:
-                    id_counts[tweet_id] = 1
-            except Exception as e:
-                bt.logging.error(f"❌ Bad format for post: {e}, {tweet}")
-                format_score[i] = 1
-
-    # Choose random responses from each miner to compare, and gather their urls
-    spot_check_idx = []
-    spot_check_urls = []
-    spot_check_tweets = []
-    for i, response in enumerate(responses):
-        if len(response) > 0:
-            item_idx = random.randrange(len(response))
-            spot_check_idx.append(item_idx)
-            url = response[item_idx].get('url')
-            if url and re.search("(twitter.com|x.com)\/\w+\/status\/\d+", url):
-                spot_check_urls.append(url)
-        else:
-            spot_check_idx.append(None)
-
-    # Fetch spot check urls
-    if len(spot_check_urls) > 0:
+
+    # Validate and flatten every tweet of the round once.
+    columns = engine.flatten(responses, tag, read_tweets, to_epochs)
+
+    planner = verification_plan.get_planner()
+    verification_cache = get_cache()
+    end = time.time() + planner.deadline
+
+    def fetch(items, max_calls):
+        """
+        Return the original tweets of `items` by id, and the number of provider calls spent.
+        """
+        ids = [item.get('id') for item in items if item.get('id') is not None]
+        # Tweets verified in earlier rounds are not fetched again.
+        verified = verification_cache.get_many("twitter", ids)
+        urls = []
+        for item in items:
+            url = item.get('url')
+            if str(item.get('id')) not in verified and url and re.search("(twitter.com|x.com)\/\w+\/status\/\d+", url) and url not in urls:
+                urls.append(url)
+        bt.logging.info(f"{len(verified)} spot check tweets cached, {len(urls)} to fetch.")
+        if len(urls) == 0:
+            return verified, 0
+
+        # If the lookup fails outright, charge the batches it would have sent.
+        calls = math.ceil(len(urls) / planner.batch_size)
         try:
-            spot_check_tweets = []
-            found_urls = set()
-            tries = 0
-            remaining_urls = set(spot_check_urls)
-            while tries < 5 and len(remaining_urls) > 3:
-                urls = random.sample(remaining_urls, k=min(20, len(remaining_urls)))
-                bt.logging.info(f"Validating {len(urls)}/{len(remaining_urls)} tweets.")
-                batch_tweets = twitter_query.searchByUrl(urls)
-                batch_urls = set([tweet['url'] for tweet in batch_tweets])
-                bt.logging.info(f"Fetched {len(batch_urls)}/{len(urls)} tweets.")
-                remaining_urls = remaining_urls - set(batch_urls)
-                spot_check_tweets += batch_tweets
-                tries += 1
-            found_urls = [tweet['url'] for tweet in spot_check_tweets]
-            missing_urls = set(spot_check_urls) - set(found_urls)
-            bt.logging.info(f"Missing {len(missing_urls)}/{len(spot_check_urls)} tweets.")
+            fetched_tweets, calls = fetch_tweets(
+                urls,
+                batch_size = planner.batch_size,
+                concurrency = planner.concurrency,
+                deadline = max(end - time.time(), 0),
+                hedge_after = planner.hedge_after,
+                retries = planner.retries,
+                max_calls = max_calls,
+            )
+            verification_cache.put_many("twitter", fetched_tweets)
+            bt.logging.info(f"Missing {len(urls) - len(fetched_tweets)}/{len(urls)} tweets.")
+            # Keep the first tweet returned for each id.
+            for tweet in fetched_tweets:
+                verified.setdefault(tweet['id'], tweet)
         except Exception as e:
             bt.logging.error(f"❌ Error while verifying post: {e}")
+        return verified, calls
 
-    # Calculate score for each response
-    for i, response in enumerate(responses):
-        # initialize variables
-        similarity_score = 0
-        relevant_count = 0
-        time_diff_score = 0
-        total_length += len(response)
-        correct_score = 1
-        # calculate max_length
-        if len(response) > max_length:
-            max_length = len(response)
-
-        # Do spot check for this miner
-        correct_score = 0
-        if len(response) > 0:
-            sample_item = response[spot_check_idx[i]]
-            searched_item = next((tweet for tweet in spot_check_tweets if tweet['id'] == sample_item['id']), None)
-            if searched_item:
-                # Normalize text to account for variations in scraped data.
-                miner_text = text_for_comparison(sample_item['text'])
-                verify_text = text_for_comparison(searched_item['text'])
-
-                # Some sources truncate time to the nearest minute.
-                # timestamp format is '2011-04-25 16:55:15+00:00', so drop the last
-                miner_timestamp = sample_item['timestamp'][:16]
-                verify_timestamp = searched_item['timestamp'][:16]
-
-                if(verify_text == miner_text and verify_timestamp == miner_timestamp):
-                    correct_score = 1
-                else:
-                    bt.logging.info(f"Tampered tweet! (idx = {i}) {sample_item}")
-                    bt.logging.info(f"Original tweet: {searched_item}")
-            else: 
-                bt.logging.info(f"No result returned for {sample_item} (miner_idx={i})")
-
-        # calculate scores
-        for i_item, item in enumerate(response):
-            if tag.lower() in item['text'].lower():
-                relevant_count += 1
-            # calculate similarity score
-            similarity_score += (id_counts[item['id']] - 1)
-            # calculate time difference score
-            date_object = datetime.datetime.strptime(item['timestamp'], '%Y-%m-%d %H:%M:%S+00:00')
-            time_diff = datetime.datetime.now() - date_object
-            time_diff_score += time_diff.seconds
-
-        if max_similar_count < similarity_score:
-            max_similar_count = similarity_score
-        if max_time_diff < time_diff_score:
-            max_time_diff = time_diff_score
-        if max_correct_score < correct_score:
-            max_correct_score = correct_score
-
-        similarity_list[i] = similarity_score
-        time_diff_list[i] = time_diff_score
-        length_list[i] = len(response)
-        correct_list[i] = correct_score
-
-        if len(response) > 0:
-            relevant_ratio[i] = relevant_count / len(response)
-        else:
-            relevant_ratio[i] = 0
-
-
-    similarity_list = (similarity_list + 1) / (max_similar_count + 1)
-    time_diff_list = (time_diff_list + 1) / (max_time_diff + 1)
-    correct_list = (correct_list + 1) / (max_correct_score + 1)
-    length_normalized = (length_list + 1) / (max_length + 1)
-
-    time_diff_contribution = (1 - time_diff_list) * 0.2
-    length_contribution = length_normalized * 0.3
-    similarity_contribution = (1 - similarity_list) * 0.3
-    relevancy_contribution = relevant_ratio * 0.2
-
-    score_list = (similarity_contribution + time_diff_contribution + length_contribution + relevancy_contribution)
-
-    pre_filtered_score = score_list.clone()
-
-    for i, correct_list_item in enumerate(correct_list):
-        if correct_list_item < 1:
-            score_list[i] = 0
-        if format_score[i] == 1:
-            score_list[i] = 0
-        if fake_score[i] == 1:
-            score_list[i] = 0
-        if relevant_ratio[i] < 0.5:
-            score_list[i] = 0
-
-    for i, response in enumerate(responses):
-        if response == [] or response == None:
-            score_list[i] = 0
-    # normalize score list
-            
-    filtered_scores = score_list.clone()
-
-    if torch.sum(score_list) == 0:
-        normalized_scores = score_list
-    else:
-        normalized_scores = score_list / torch.sum(score_list)
-
-    scoring_metrics = {
-        "correct": correct_list,
-        "similarity": similarity_list,
-        "time_diff": time_diff_list,
-        "time_contrib": time_diff_contribution,
-        "length": length_list,
-        "length_contrib": length_contribution,
-        "similarity_contrib": similarity_contribution,
-        "relevancy_contrib": relevancy_contribution,
-        "format": format_score,
-        "fake": fake_score,
-        "pre_filtered_score": pre_filtered_score,
-        "filtered_scores": filtered_scores,
-        "normalized_scores": normalized_scores,
-    }
+    # Spot check as many tweets per miner as the round's budget allows.
+    verification = planner.verify(responses, fetch, matches, history = history)
+    bt.logging.info(f"Spot checked {sum(verification['checked'])} tweets with {verification['calls']} provider calls.")
 
+    scoring_metrics = engine.score(columns, verification["correct"])
+    scoring_metrics.update(verification_plan.metrics(verification))
     return scoring_metrics
-        
-
-
-    
-
@@ -0,0 +1,167 @@
+"""
+The MIT License (MIT)
+Copyright © 2023 Chris Wilson
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+the Software.
+
+THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import Dict, Iterable, List
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS verified (
+    source TEXT NOT NULL,
+    id TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    PRIMARY KEY (source, id)
+);
+CREATE INDEX IF NOT EXISTS verified_accessed_at ON verified (accessed_at);
+"""
+
+
+class VerificationCache:
+    """
+    An on-disk cache of items fetched from external services to spot-check miners.
+
+    Entries are keyed by source and item id (tweet id or reddit fullname) and hold the
+    fetched item and when it was fetched. Entries older
+    than `ttl` are treated as missing, and the least recently used entries beyond
+    `max_entries` are removed. Scoring processes share the database file, which runs in WAL
+    mode.
+    """
+
+    def __init__(self, path: str, ttl: float = 7 * 24 * 3600, max_entries: int = 200000):
+        """
+        Args:
+            path (str): Location of the database file.
+            ttl (float): Seconds a fetched item stays valid.
+            max_entries (int): Maximum number of cached items.
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        self._connection().executescript(SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get_many(self, source: str, ids: Iterable[str]) -> Dict[str, dict]:
+        """
+        Return the fresh cached items among `ids`, keyed by id, and mark them as recently used.
+        """
+        ids = list({str(id) for id in ids})
+        if len(ids) == 0:
+            return {}
+        now = time.time()
+        conn = self._connection()
+        found = {}
+        # Stay below SQLite's default limit of 999 bound parameters.
+        for start in range(0, len(ids), 900):
+            chunk = ids[start:start + 900]
+            rows = conn.execute(
+                f"SELECT id, payload FROM verified WHERE source = ? AND fetched_at >= ? AND id IN ({','.join('?' * len(chunk))})",
+                [source, now - self.ttl] + chunk,
+            ).fetchall()
+            found.update((id, json.loads(payload)) for id, payload in rows)
+        if len(found) > 0:
+            with conn:
+                conn.executemany("UPDATE verified SET accessed_at = ? WHERE source = ? AND id = ?", [(now, source, id) for id in found])
+        self.hits += len(found)
+        self.misses += len(ids) - len(found)
+        return found
+
+    def put_many(self, source: str, items: List[dict]):
+        """
+        Store fetched items, replacing older copies.
+
+        Args:
+            source (str): The data source, e.g. "twitter" or "reddit".
+            items (list): Items as returned by the lookup, each with an 'id'.
+        """
+        now = time.time()
+        rows = []
+        for item in items:
+            try:
+                rows.append((
+                    source,
+                    str(item['id']),
+                    json.dumps(item),
+                    now,
+                    now,
+                ))
+            except (KeyError, TypeError):
+                continue
+        if len(rows) == 0:
+            return
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO verified (source, id, payload, fetched_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection):
+        conn.execute("DELETE FROM verified WHERE fetched_at < ?", (time.time() - self.ttl,))
+        excess = conn.execute("SELECT COUNT(*) FROM verified").fetchone()[0] - self.max_entries
+        if excess > 0:
+            conn.execute("DELETE FROM verified WHERE rowid IN (SELECT rowid FROM verified ORDER BY accessed_at LIMIT ?)", (excess,))
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_ratio": self.hits / lookups if lookups else 0.0}
+
+
+_settings = {"path": "verification_cache.db"}
+_cache = None
+_cache_pid = None
+
+
+def configure(path: str, ttl: float = 7 * 24 * 3600, max_entries: int = 200000):
+    """
+    Set the location, TTL and size of this process's verification cache before its first use.
+    """
+    global _settings, _cache
+    _settings = {"path": path, "ttl": ttl, "max_entries": max_entries}
+    _cache = None
+
+
+def get_cache() -> VerificationCache:
+    """
+    Return this process's verification cache, opening it with the configured settings on first use.
+    """
+    global _cache, _cache_pid
+    if _cache is None or _cache_pid != os.getpid():
+        _cache = VerificationCache(**_settings)
+        _cache_pid = os.getpid()
+    return _cache
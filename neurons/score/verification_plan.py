@@ -0,0 +1,282 @@
+"""
+The MIT License (MIT)
+Copyright © 2023 Chris Wilson
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+the Software.
+
+THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+import math
+import random
+from typing import Callable, List, Tuple
+import torch
+import bittensor as bt
+
+
+def confidence(clean: float, failed: int, tolerance: float) -> float:
+    """
+    Return the probability that a miner's items are at least (1 - tolerance) genuine.
+
+    The miner's pass rate gets a uniform prior, updated with `clean` passed and `failed`
+    failed checks, i.e. a Beta(1 + clean, 1 + failed) posterior. `failed` must be a whole
+    number, which makes the Beta tail a finite sum.
+    """
+    a = 1.0 + clean
+    b = 1 + int(failed)
+    q = 1.0 - tolerance
+    # P(p < q) = q^a * sum_{j < b} Gamma(a + j) / (Gamma(a) j!) * (1 - q)^j
+    log_q, log_rest = math.log(q), math.log(1.0 - q)
+    below = sum(
+        math.exp(a * log_q + math.lgamma(a + j) - math.lgamma(a) - math.lgamma(j + 1) + j * log_rest)
+        for j in range(b)
+    )
+    return min(max(1.0 - below, 0.0), 1.0)
+
+
+class MinerCheck:
+    """
+    The spot check of one miner's response within a round.
+    """
+
+    def __init__(self, position: int, length: int, prior_clean: float, prior_failed: int):
+        self.position = position
+        self.prior_clean = prior_clean
+        self.prior_failed = prior_failed
+        # Items are drawn without replacement, in a random order fixed up front.
+        self.order = random.sample(range(length), length)
+        self.drawn = 0
+        self.checked = 0
+        self.failed = 0
+
+    def remaining(self) -> int:
+        return len(self.order) - self.drawn
+
+    def draw(self, count: int) -> List[int]:
+        items = self.order[self.drawn:self.drawn + count]
+        self.drawn += len(items)
+        return items
+
+
+class VerificationPlanner:
+    """
+    Decides how many items of each miner to spot-check within a budget of provider calls.
+
+    Every miner with items gets one check, as it always did. The rest of the budget is spent in
+    waves on the miners whose result is not yet settled. A miner is settled as soon as one of its
+    items fails, or once the checks passed this round and earlier make it at least `target` likely
+    that no more than `tolerance` of its items are forged. Miners that failed before therefore
+    need more clean checks than miners with a long clean record. Waves are packed into full
+    provider calls, and slots left over in a call go to the least certain miners.
+
+    The planner also carries the time budget of a round's spot checks and how the scorers run
+    their provider lookups within it.
+    """
+
+    def __init__(self, batch_size: int = 20, max_calls: int = 5, tolerance: float = 0.2, target: float = 0.9, history_weight: float = 0.5,
+                 deadline: float = 40, concurrency: int = 4, hedge_after: float = 20, retries: int = 1):
+        """
+        Args:
+            batch_size (int): Items verified by one provider call.
+            max_calls (int): Provider calls a round may spend.
+            tolerance (float): Fraction of forged items the check has to rule out.
+            target (float): Confidence at which a miner's result is settled.
+            history_weight (float): Weight of one earlier check relative to a check of this round.
+            deadline (float): Seconds a round may spend on provider lookups.
+            concurrency (int): Maximum number of lookups running at once on each provider.
+            hedge_after (float): Seconds after which a slow lookup is also sent to a fallback provider.
+            retries (int): How many times an item missing from a lookup is looked up again.
+        """
+        self.batch_size = batch_size
+        self.max_calls = max_calls
+        self.tolerance = tolerance
+        self.target = target
+        self.history_weight = history_weight
+        self.deadline = deadline
+        self.concurrency = concurrency
+        self.hedge_after = hedge_after
+        self.retries = retries
+
+    def confidence(self, miner: MinerCheck) -> float:
+        clean = self.history_weight * miner.prior_clean + miner.checked - miner.failed
+        failed = round(self.history_weight * miner.prior_failed) + miner.failed
+        return confidence(clean, failed, self.tolerance)
+
+    def settled(self, miner: MinerCheck) -> bool:
+        return miner.failed > 0 or miner.remaining() == 0 or self.confidence(miner) >= self.target
+
+    def needed(self, miner: MinerCheck) -> int:
+        """
+        Return how many more clean checks would settle `miner`, capped by its unchecked items.
+        """
+        if self.settled(miner):
+            return 0
+        base = self.history_weight * miner.prior_clean + miner.checked
+        failed = round(self.history_weight * miner.prior_failed)
+        for extra in range(1, miner.remaining()):
+            if confidence(base + extra, failed, self.tolerance) >= self.target:
+                return extra
+        return miner.remaining()
+
+    def allocate(self, miners: List[MinerCheck], first: bool, capacity: int) -> dict:
+        """
+        Return the number of items to check per miner position in the next wave.
+        """
+        if first:
+            wanted = {miner.position: 1 for miner in miners if miner.remaining() > 0}
+        else:
+            wanted = {miner.position: self.needed(miner) for miner in miners}
+            wanted = {position: count for position, count in wanted.items() if count > 0}
+        total = sum(wanted.values())
+        if total == 0 or capacity <= 0:
+            return {}
+        # Round up to whole calls, but keep half of the budget for the waves after this one.
+        calls = math.ceil(total / self.batch_size)
+        if not first:
+            calls = min(calls, max(1, capacity // self.batch_size // 2))
+        size = min(calls * self.batch_size, capacity)
+
+        # Least certain miners are served first, one item at a time.
+        ranked = sorted(miners, key=self.confidence)
+        allocation = {}
+        while size > 0:
+            progress = False
+            for miner in ranked:
+                count = allocation.get(miner.position, 0)
+                if count < wanted.get(miner.position, 0) and size > 0:
+                    allocation[miner.position] = count + 1
+                    size -= 1
+                    progress = True
+            if not progress:
+                break
+        # Fill the rest of the last call with extra checks of unsettled miners.
+        while size > 0:
+            progress = False
+            for miner in ranked:
+                count = allocation.get(miner.position, 0)
+                if not self.settled(miner) and count < miner.remaining() and size > 0:
+                    allocation[miner.position] = count + 1
+                    size -= 1
+                    progress = True
+            if not progress:
+                break
+        return allocation
+
+    def verify(self, responses: list, fetch: Callable, matches: Callable, history: List[Tuple[float, int]] = None) -> dict:
+        """
+        Spot-check the miners of a round.
+
+        Args:
+            responses (list): The miners' responses.
+            fetch (Callable): Takes a list of miner items and the number of provider calls it may
+                spend, and returns (verified, calls): the original items by id and the number of
+                provider calls actually spent.
+            matches (Callable): Takes a miner item and its original, returns whether they agree.
+            history (list, optional): (clean, failed) spot check counts of each miner from
+                earlier rounds, in response order.
+
+        Returns:
+            dict: Per miner lists of "correct" (1 if every checked item was verified),
+                "checked" (items checked), "failed" (items that failed) and "confidence",
+                plus the number of provider "calls" spent.
+
+        An item the provider did not return fails its miner only if it is the miner's one mandatory
+        check, as it always did. Any other missing item, whether it pads out the first wave or
+        belongs to a later one, is left unchecked: the lookup may have hit the deadline or failed,
+        and a provider miss should not cost an honest miner more than it did with a single check.
+        """
+        miners = []
+        for i, response in enumerate(responses):
+            prior_clean, prior_failed = history[i] if history is not None and history[i] is not None else (0.0, 0)
+            miners.append(MinerCheck(i, len(response), prior_clean, prior_failed))
+
+        calls_left = self.max_calls
+        first = True
+        while True:
+            if first:
+                # Every miner is checked at least once, whatever the budget.
+                calls = max(calls_left, 1)
+                allocation = self.allocate(miners, True, calls * self.batch_size)
+            else:
+                calls = calls_left
+                unsettled = [miner for miner in miners if not self.settled(miner)]
+                allocation = self.allocate(unsettled, False, calls * self.batch_size)
+            if len(allocation) == 0:
+                break
+
+            # In the first wave, the first item drawn for each miner is its mandatory check.
+            items = []
+            for position, count in allocation.items():
+                miner = miners[position]
+                items += [(miner, responses[position][index], first and n == 0) for n, index in enumerate(miner.draw(count))]
+            verified, spent = fetch([item for _, item, _ in items], calls)
+            calls_left -= spent
+
+            # A wave that verified nothing at all points at the provider, not the miners.
+            if not first and len(verified) == 0:
+                bt.logging.info(f"Spot check wave of {len(items)} items returned nothing, stopping early.")
+                break
+            for miner, item, mandatory in items:
+                original = verified.get(item.get('id'))
+                if original is None:
+                    bt.logging.info(f"No result returned for {item} (miner_idx={miner.position})")
+                    if mandatory:
+                        miner.checked += 1
+                        miner.failed += 1
+                    continue
+                miner.checked += 1
+                try:
+                    passed = matches(item, original)
+                except Exception as e:
+                    bt.logging.info(f"❌ Bad format for spot checked item: {e}, {item}")
+                    passed = False
+                if not passed:
+                    miner.failed += 1
+            first = False
+
+        return {
+            "correct": [1 if miner.checked > 0 and miner.failed == 0 else 0 for miner in miners],
+            "checked": [miner.checked for miner in miners],
+            "failed": [miner.failed for miner in miners],
+            "confidence": [self.confidence(miner) for miner in miners],
+            "calls": self.max_calls - calls_left,
+        }
+
+
+def metrics(result: dict) -> dict:
+    """
+    Return the per miner results of VerificationPlanner.verify as scoring metrics.
+    """
+    return {
+        "checked": torch.tensor(result["checked"], dtype=torch.float32),
+        "failed": torch.tensor(result["failed"], dtype=torch.float32),
+        "confidence": torch.tensor(result["confidence"], dtype=torch.float32),
+    }
+
+
+_planner = VerificationPlanner()
+
+
+def configure(**settings):
+    """
+    Replace this process's planner with one built from `settings`, the VerificationPlanner arguments.
+    """
+    global _planner
+    _planner = VerificationPlanner(**settings)
+
+
+def get_planner() -> VerificationPlanner:
+    """
+    Return this process's planner.
+    """
+    return _planner
@@ -0,0 +1,196 @@
+"""
+The MIT License (MIT)
+Copyright © 2023 Chris Wilson
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+the Software.
+
+THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+import os
+import re
+import json
+import time
+from typing import Iterator, List, Optional
+import torch
+import bittensor as bt
+
+SEGMENT = re.compile(r"^journal\.(\d+)\.jsonl$")
+CHECKPOINT = "checkpoint.json"
+
+
+def resize_scores(scores: torch.Tensor, size: int) -> torch.Tensor:
+    """
+    Return `scores` with one entry per uid of a metagraph of `size` uids: uids beyond it have
+    deregistered and are dropped, new uids start at zero.
+    """
+    resized = torch.zeros(size, dtype=torch.float32)
+    kept = min(size, len(scores))
+    resized[:kept] = scores[:kept]
+    return resized
+
+
+class ScoreJournal:
+    """
+    A crash-safe, append-only record of the validator's scores.
+
+    Every score change is appended as one JSON line keyed by (block, source, uid, hotkey),
+    carrying both the round score and the resulting moving average. The journal is split
+    into numbered segments: a checkpoint of the full score vector is written through a
+    temporary file and an atomic rename, after which a new segment is started. Restoring
+    loads the checkpoint and replays the segments written after it.
+
+    Old segments are kept, up to `keep_segments`, so moving averages can be rebuilt offline
+    with read_history().
+    """
+
+    def __init__(self, directory: str, checkpoint_every: int = 100, keep_segments: int = 48):
+        """
+        Args:
+            directory (str): Where the checkpoint and the journal segments are kept.
+            checkpoint_every (int): Number of appended rounds after which checkpoint_due() is true.
+            keep_segments (int): Number of journal segments kept for history.
+        """
+        self.directory = directory
+        self.checkpoint_every = checkpoint_every
+        self.keep_segments = keep_segments
+        self.pending = 0
+        os.makedirs(directory, exist_ok=True)
+        segments = self._segments()
+        self.segment = max(segments[-1] + 1 if len(segments) > 0 else 0, self._checkpoint_segment() + 1)
+        self._file = None
+
+    def _checkpoint_segment(self) -> int:
+        """
+        Return the last segment included in the checkpoint, or -1 without a checkpoint.
+        """
+        path = os.path.join(self.directory, CHECKPOINT)
+        if not os.path.exists(path):
+            return -1
+        with open(path) as f:
+            return json.load(f)["segment"]
+
+    def _segments(self) -> List[int]:
+        return sorted(int(m.group(1)) for m in map(SEGMENT.match, os.listdir(self.directory)) if m)
+
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.directory, f"journal.{segment}.jsonl")
+
+    def _open(self):
+        if self._file is None:
+            self._file = open(self._segment_path(self.segment), "a")
+        return self._file
+
+    def append(self, block: int, source: str, entries: list, alpha: float = None, checks: list = None):
+        """
+        Append one round of score changes with a single write.
+
+        Args:
+            block (int): The block the round was applied at.
+            source (str): The round kind, e.g. "twitter", "reddit" or "reset".
+            entries (list): (uid, hotkey, score, ema) tuples: the round score and the new moving average.
+            alpha (float, optional): EMA factor the round was applied with.
+            checks (list, optional): (checked, failed) spot check counts per entry, None for
+                miners that were not spot-checked. Recorded as "checked" and "failed".
+        """
+        if len(entries) == 0:
+            return
+        now = round(time.time(), 3)
+        records = []
+        for i, (uid, hotkey, score, ema) in enumerate(entries):
+            record = {"block": block, "source": source, "uid": int(uid), "hotkey": hotkey, "score": float(score), "ema": float(ema), "alpha": alpha, "time": now}
+            if checks is not None and checks[i] is not None:
+                record["checked"], record["failed"] = int(checks[i][0]), int(checks[i][1])
+            records.append(record)
+        lines = "".join(json.dumps(record) + "\n" for record in records)
+        journal = self._open()
+        journal.write(lines)
+        journal.flush()
+        os.fsync(journal.fileno())
+        self.pending += 1
+
+    def checkpoint_due(self) -> bool:
+        return self.pending >= self.checkpoint_every
+
+    def checkpoint(self, block: int, scores: torch.Tensor, hotkeys: list):
+        """
+        Write the full score vector atomically and start a new journal segment.
+        """
+        state = {"block": block, "segment": self.segment, "scores": scores.tolist(), "hotkeys": list(hotkeys), "time": time.time()}
+        path = os.path.join(self.directory, CHECKPOINT)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self.segment += 1
+        self.pending = 0
+
+        for segment in self._segments()[:-self.keep_segments]:
+            os.remove(self._segment_path(segment))
+
+    def restore(self, hotkeys: list) -> Optional[torch.Tensor]:
+        """
+        Rebuild the score vector from the newest checkpoint and the journal written after it.
+
+        Scores recorded for a different hotkey than the one now holding the uid are dropped,
+        since the uid has been re-registered. The vector has one score per hotkey. Returns None
+        if nothing has been saved yet.
+        """
+        path = os.path.join(self.directory, CHECKPOINT)
+        scores, owners, first_segment = {}, {}, 0
+        if os.path.exists(path):
+            with open(path) as f:
+                state = json.load(f)
+            for uid, (score, hotkey) in enumerate(zip(state["scores"], state["hotkeys"])):
+                scores[uid], owners[uid] = score, hotkey
+            first_segment = state["segment"] + 1
+        elif len(self._segments()) == 0:
+            return None
+
+        for record in self.read_history(first_segment):
+            scores[record["uid"]], owners[record["uid"]] = record["ema"], record["hotkey"]
+
+        # Uids beyond the current metagraph have deregistered; their scores are dropped.
+        restored = torch.zeros(len(hotkeys), dtype=torch.float32)
+        for uid, score in scores.items():
+            if uid < len(hotkeys) and owners[uid] == hotkeys[uid]:
+                restored[uid] = score
+        bt.logging.info(f"Restored scores of {len(scores)} uids from {self.directory}")
+        return restored
+
+    def read_history(self, first_segment: int = 0) -> Iterator[dict]:
+        """
+        Yield the journal records of every kept segment from `first_segment` on, oldest first.
+
+        A line cut short by a crash is skipped.
+        """
+        for segment in self._segments():
+            if segment < first_segment:
+                continue
+            with open(self._segment_path(segment)) as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
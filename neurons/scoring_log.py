@@ -0,0 +1,128 @@
+"""
+The MIT License (MIT)
+Copyright © 2023 Chris Wilson
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+the Software.
+
+THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+import os
+import json
+import gzip
+import time
+import queue
+import threading
+from datetime import datetime, timezone
+from typing import Iterator
+import bittensor as bt
+
+
+def _plain(value):
+    """
+    Convert tensors and arrays in scoring metrics to JSON friendly lists and numbers.
+    """
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    return value
+
+
+class ScoringLog:
+    """
+    Appends scoring debug records to one gzip compressed JSONL file per UTC day.
+
+    Records are queued and written by a background thread, so a round only pays for a
+    queue put. When the queue is full the record is dropped and counted rather than
+    blocking the caller.
+    """
+
+    def __init__(self, directory: str, max_queue: int = 64):
+        """
+        Args:
+            directory (str): Where the daily files are written.
+            max_queue (int): Maximum number of records waiting to be written.
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._file = None
+        self._day = None
+        self.written = 0
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run, name="scoring-log", daemon=True)
+        self._thread.start()
+
+    def path_for(self, day: str) -> str:
+        return os.path.join(self.directory, f"scoring-{day}.jsonl.gz")
+
+    def write(self, record: dict) -> bool:
+        """
+        Queue a record for writing. Returns False if it was dropped because the queue is full.
+        """
+        try:
+            self._queue.put_nowait(record)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _run(self):
+        while True:
+            record = self._queue.get()
+            if record is None:
+                break
+            try:
+                day = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+                if day != self._day:
+                    if self._file is not None:
+                        self._file.close()
+                    # Appending starts a new gzip member; readers see one continuous stream.
+                    self._file = gzip.open(self.path_for(day), "at", compresslevel=6)
+                    self._day = day
+                self._file.write(json.dumps(_plain(record)) + "\n")
+                # Flush per record so a crash loses at most the record being written.
+                self._file.flush()
+                self.written += 1
+            except Exception as e:
+                bt.logging.error(f"❌ Error writing scoring log: {e}")
+        if self._file is not None:
+            self._file.close()
+
+    def stats(self) -> dict:
+        return {"queued": self._queue.qsize(), "written": self.written, "dropped": self.dropped}
+
+    def close(self, timeout: float = 10):
+        """
+        Write the queued records and close the current file.
+        """
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+
+def read_scoring_log(path: str) -> Iterator[dict]:
+    """
+    Yield the records of a daily scoring log file, oldest first. A record cut short by a crash ends the file.
+    """
+    with gzip.open(path, "rt") as f:
+        try:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+        except (EOFError, OSError):
+            return
@@ -0,0 +1,162 @@
+"""
+The MIT License (MIT)
+Copyright © 2023 Chris Wilson
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+the Software.
+
+THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+import time
+import asyncio
+import functools
+import traceback
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List
+import bittensor as bt
+
+
+class ScoringJob:
+    """
+    The responses of one query round waiting to be scored.
+
+    Attributes:
+        spec: The RoundSpec of the round, providing the scorer and EMA factor.
+        uids (list): The queried miners, in response order.
+        search_key (str): The keyword the miners were asked for.
+        responses (list): The deserialized miner responses.
+        query_secs (float): How long the dendrite query took.
+        timed_out (list): Positions of the miners that had not answered when the round closed.
+        history (list): (clean, failed) spot check counts of each miner from earlier rounds.
+    """
+
+    def __init__(self, spec, uids: List[int], search_key: str, responses: list, query_secs: float, timed_out: List[int] = None, history: list = None):
+        self.spec = spec
+        self.uids = uids
+        self.search_key = search_key
+        self.responses = responses
+        self.query_secs = query_secs
+        self.timed_out = [] if timed_out is None else timed_out
+        self.history = history
+        self.queued_at = None
+        self.started_at = None
+        self.finished_at = None
+
+
+class ScoringPipeline:
+    """
+    Scores query rounds in a process pool so dendrite queries never wait on scoring.
+
+    Rounds hand their responses to a bounded queue and move on. Up to `workers` jobs are
+    scored at once, and results are applied strictly in submission order, so EMA updates
+    happen in the same order as the rounds were queried.
+    """
+
+    def __init__(self, apply: Callable, workers: int = 2, max_queue: int = 8, initializer: Callable = None, initargs: tuple = ()):
+        """
+        Args:
+            apply (Callable): Called on the event loop with (job, scoring_metrics) for each scored
+                job, in submission order. scoring_metrics is None if scoring failed.
+            workers (int): Number of scoring processes.
+            max_queue (int): Maximum number of rounds waiting to be scored before submitters wait.
+            initializer (Callable, optional): Run with `initargs` once in each scoring process,
+                e.g. to configure the scorers.
+            initargs (tuple): Arguments of `initializer`.
+        """
+        self.apply = apply
+        self.workers = workers
+        # Spawned workers do not inherit the event loop or the threads of the validator.
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=initializer,
+            initargs=initargs,
+        )
+        self._queue = asyncio.Queue(maxsize=max_queue)
+        self._scoring = asyncio.Queue(maxsize=workers)
+        self._latency = {}
+        self.scored = 0
+        self.failed = 0
+
+    async def submit(self, job: ScoringJob):
+        """
+        Queue a round for scoring, waiting only if the queue is full.
+        """
+        job.queued_at = time.time()
+        await self._queue.put(job)
+
+    def depth(self) -> int:
+        """
+        Return the number of rounds queued or being scored.
+        """
+        return self._queue.qsize() + self._scoring.qsize()
+
+    async def run(self):
+        """
+        Dispatch queued jobs to the process pool and apply their results until cancelled.
+        """
+        await asyncio.gather(self._dispatch(), self._apply_in_order())
+
+    async def _dispatch(self):
+        loop = asyncio.get_event_loop()
+        while True:
+            job = await self._queue.get()
+            job.started_at = time.time()
+            future = loop.run_in_executor(
+                self._executor,
+                functools.partial(job.spec.scorer, responses = job.responses, tag = job.search_key, history = job.history)
+            )
+            await self._scoring.put((job, future))
+
+    async def _apply_in_order(self):
+        while True:
+            job, future = await self._scoring.get()
+            try:
+                scoring_metrics = await future
+                self.scored += 1
+            except Exception as e:
+                bt.logging.error(f"❌ Error in {job.spec.name} score: {e}")
+                traceback.print_exc()
+                scoring_metrics = None
+                self.failed += 1
+            job.finished_at = time.time()
+
+            try:
+                self.apply(job, scoring_metrics)
+            except Exception as e:
+                bt.logging.error(f"❌ Error applying {job.spec.name} scores: {e}")
+                traceback.print_exc()
+
+            self._record("query", job.query_secs)
+            self._record("queue_wait", job.started_at - job.queued_at)
+            self._record("scoring", job.finished_at - job.started_at)
+            self._record("apply", time.time() - job.finished_at)
+
+    def _record(self, stage: str, secs: float, alpha: float = 0.2):
+        previous = self._latency.get(stage)
+        self._latency[stage] = secs if previous is None else alpha * secs + (1 - alpha) * previous
+
+    def stats(self) -> dict:
+        """
+        Return the queue depth, job counters and the moving average latency of each stage in seconds.
+        """
+        return {
+            "depth": self.depth(),
+            "scored": self.scored,
+            "failed": self.failed,
+            "latency": {stage: round(secs, 3) for stage, secs in self._latency.items()},
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,262 @@
+"""
+The MIT License (MIT)
+Copyright © 2023 Chris Wilson
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+the Software.
+
+THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from neurons import timestamps
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    source TEXT NOT NULL,
+    id TEXT NOT NULL,
+    title TEXT,
+    text TEXT,
+    created_at INTEGER NOT NULL,
+    stored_at INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (source, id)
+);
+CREATE INDEX IF NOT EXISTS items_created_at ON items (source, created_at DESC);
+
+CREATE TABLE IF NOT EXISTS watermarks (
+    source TEXT NOT NULL,
+    keyword TEXT NOT NULL,
+    newest_at INTEGER NOT NULL,
+    newest_id TEXT,
+    updated_at INTEGER NOT NULL,
+    PRIMARY KEY (source, keyword)
+);
+"""
+
+# The full-text index, kept in sync with the items table by triggers.
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(
+    title, text, content='items', content_rowid='rowid', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS items_ai AFTER INSERT ON items BEGIN
+    INSERT INTO items_fts(rowid, title, text) VALUES (new.rowid, new.title, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS items_ad AFTER DELETE ON items BEGIN
+    INSERT INTO items_fts(items_fts, rowid, title, text) VALUES ('delete', old.rowid, old.title, old.text);
+END;
+CREATE TRIGGER IF NOT EXISTS items_au AFTER UPDATE ON items BEGIN
+    INSERT INTO items_fts(items_fts, rowid, title, text) VALUES ('delete', old.rowid, old.title, old.text);
+    INSERT INTO items_fts(rowid, title, text) VALUES (new.rowid, new.title, new.text);
+END;
+"""
+
+FTS_TRIGGERS = ("items_ai", "items_ad", "items_au")
+
+
+def trigram_supported() -> bool:
+    """
+    Return whether this SQLite build has FTS5 with the trigram tokenizer (SQLite 3.34 and later).
+    """
+    conn = sqlite3.connect(":memory:")
+    try:
+        conn.execute("CREATE VIRTUAL TABLE probe USING fts5(text, tokenize='trigram')")
+        return True
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        conn.close()
+
+
+def to_epoch(timestamp) -> int:
+    """
+    Convert a provider timestamp ('2011-04-25 16:55:15+00:00', '2023-11-20T10:00:00.000Z', ...) to epoch seconds.
+    """
+    epoch = timestamps.to_epoch(timestamp)
+    if epoch is None:
+        raise ValueError(f"Unparsable timestamp: {timestamp!r}")
+    return epoch
+
+
+class LocalStore:
+    """
+    A local SQLite store for scraped tweets and reddit items.
+
+    Items are kept per source with a trigram FTS5 index over title and text, so
+    "latest N items containing keyword K" is an index lookup. SQLite builds without the
+    trigram tokenizer scan the newest items of the source with LIKE instead. The database
+    runs in WAL mode so axon handlers can read while scrapes are being ingested.
+
+    Attributes:
+        path (str): Location of the database file.
+        retention_secs (float): Items created longer ago than this are pruned.
+        max_items (int): Maximum number of items kept per source.
+    """
+
+    def __init__(self, path: str, retention_secs: float = 48 * 3600, max_items: int = 200000):
+        self.path = path
+        self.retention_secs = retention_secs
+        self.max_items = max_items
+        self._local = threading.local()
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+
+        conn = self._connection()
+        # auto_vacuum only takes effect before the first table is created.
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.executescript(SCHEMA)
+
+        triggers = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+        self.fts = trigram_supported()
+        if self.fts:
+            conn.executescript(FTS_SCHEMA)
+            if not triggers.issuperset(FTS_TRIGGERS):
+                # Items ingested while the index was not maintained are indexed now.
+                with conn:
+                    conn.execute("INSERT INTO items_fts(items_fts) VALUES ('rebuild')")
+        else:
+            # A database created by a newer SQLite would otherwise fail every insert.
+            with conn:
+                for trigger in FTS_TRIGGERS:
+                    conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Return this thread's connection, opening it on first use.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def ingest(self, source: str, items: list, keyword: str = None, complete: bool = True) -> int:
+        """
+        Insert or update scraped items in a single transaction.
+
+        Args:
+            source (str): The data source, e.g. "twitter" or "reddit".
+            items (list): Items in the format returned to validators.
+            keyword (str, optional): The keyword the items were scraped for. Its high-water
+                mark is advanced to the newest item ingested.
+            complete (bool): False when the scrape was cut short, by a deadline or an item
+                limit, so items older than the ones returned may be missing. The high-water
+                mark then only advances to the oldest item ingested, and the next incremental
+                scrape starts from there instead of skipping what was cut off.
+
+        Returns:
+            int: The number of items written.
+        """
+        now = int(time.time())
+        rows = []
+        for item in items:
+            try:
+                rows.append((
+                    source,
+                    str(item['id']),
+                    item.get('title'),
+                    item.get('text'),
+                    to_epoch(item['timestamp']),
+                    now,
+                    json.dumps(item),
+                ))
+            except (KeyError, TypeError, ValueError):
+                continue
+
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "INSERT INTO items (source, id, title, text, created_at, stored_at, payload) VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (source, id) DO UPDATE SET title = excluded.title, text = excluded.text, "
+                "created_at = excluded.created_at, stored_at = excluded.stored_at, payload = excluded.payload",
+                rows,
+            )
+            if keyword is not None and len(rows) > 0:
+                mark = (max if complete else min)(rows, key=lambda row: row[4])
+                conn.execute(
+                    "INSERT INTO watermarks (source, keyword, newest_at, newest_id, updated_at) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT (source, keyword) DO UPDATE SET newest_at = excluded.newest_at, "
+                    "newest_id = excluded.newest_id, updated_at = excluded.updated_at WHERE excluded.newest_at > newest_at",
+                    (source, keyword.lower(), mark[4], mark[1], now),
+                )
+        return len(rows)
+
+    def watermark(self, source: str, keyword: str):
+        """
+        Return the creation time (epoch seconds) of the newest item ingested for `keyword`, or None.
+        """
+        row = self._connection().execute(
+            "SELECT newest_at FROM watermarks WHERE source = ? AND keyword = ?", (source, keyword.lower())
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def latest(self, source: str, keyword: str, limit: int) -> list:
+        """
+        Return the newest items from `source` whose title or text contains `keyword`.
+
+        Matching is case-insensitive substring matching, the same test validators use for relevance.
+        """
+        conn = self._connection()
+        if self.fts and len(keyword) >= 3:
+            # Trigram tokens make a quoted phrase match any substring of at least three characters.
+            rows = conn.execute(
+                "SELECT payload FROM items WHERE source = ? AND rowid IN "
+                "(SELECT rowid FROM items_fts WHERE items_fts MATCH ?) ORDER BY created_at DESC LIMIT ?",
+                (source, '"' + keyword.replace('"', '""') + '"', limit),
+            ).fetchall()
+        else:
+            pattern = "%" + keyword.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            rows = conn.execute(
+                "SELECT payload FROM items WHERE source = ? AND (title LIKE ? ESCAPE '\\' OR text LIKE ? ESCAPE '\\') "
+                "ORDER BY created_at DESC LIMIT ?",
+                (source, pattern, pattern, limit),
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def prune(self) -> int:
+        """
+        Apply the retention policy and release freed pages back to the filesystem.
+
+        Returns:
+            int: The number of items removed.
+        """
+        conn = self._connection()
+        cutoff = int(time.time() - self.retention_secs)
+        with conn:
+            removed = conn.execute("DELETE FROM items WHERE created_at < ?", (cutoff,)).rowcount
+            # Keywords whose items have all aged out are scraped from scratch next time.
+            conn.execute("DELETE FROM watermarks WHERE newest_at < ?", (cutoff,))
+            for (source,) in conn.execute("SELECT DISTINCT source FROM items").fetchall():
+                removed += conn.execute(
+                    "DELETE FROM items WHERE source = ? AND rowid NOT IN "
+                    "(SELECT rowid FROM items WHERE source = ? ORDER BY created_at DESC LIMIT ?)",
+                    (source, source, self.max_items),
+                ).rowcount
+        conn.execute("PRAGMA incremental_vacuum")
+        return removed
+
+    def count(self, source: str = None) -> int:
+        """
+        Return the number of stored items, optionally for one source.
+        """
+        conn = self._connection()
+        if source is None:
+            return conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+        return conn.execute("SELECT COUNT(*) FROM items WHERE source = ?", (source,)).fetchone()[0]
@@ -0,0 +1,197 @@
+"""
+The MIT License (MIT)
+Copyright © 2023 Chris Wilson
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+the Software.
+
+THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+import re
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import List, Optional
+
+try:
+    from dateutil.parser import parse as _dateutil_parse
+except ImportError:
+    _dateutil_parse = None
+
+# 'YYYY-MM-DD', 'T' or space, 'HH:MM:SS', optional fraction, optional 'Z' or +HH:MM / +HHMM offset.
+ISO = re.compile(r"(\d{4})-(\d\d)-(\d\d)[T ](\d\d):(\d\d):(\d\d)(?:\.(\d{1,9}))?(Z|[+-]\d\d:?\d\d)?")
+DAYS_IN_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def _days_from_civil(year: int, month: int, day: int) -> int:
+    """
+    Return the number of days from 1970-01-01 to the given proleptic Gregorian date.
+    """
+    year -= month <= 2
+    era = (year if year >= 0 else year - 399) // 400
+    yoe = year - era * 400
+    doy = (153 * (month + (-3 if month > 2 else 9)) + 2) // 5 + day - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
+
+
+def _civil_from_days(days: int):
+    """
+    Return the (year, month, day) `days` after 1970-01-01.
+    """
+    days += 719468
+    era = (days if days >= 0 else days - 146096) // 146097
+    doe = days - era * 146097
+    yoe = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+    doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+    mp = (5 * doy + 2) // 153
+    day = doy - (153 * mp + 2) // 5 + 1
+    month = mp + (3 if mp < 10 else -9)
+    return yoe + era * 400 + (month <= 2), month, day
+
+
+def _valid(year: int, month: int, day: int, hour: int, minute: int, second: int) -> bool:
+    if not (1 <= month <= 12 and 1 <= day and hour < 24 and minute < 60 and second < 60):
+        return False
+    leap = month == 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+    return day <= DAYS_IN_MONTH[month - 1] + leap
+
+
+def _parse_iso(value: str) -> Optional[int]:
+    """
+    Fast path: parse the ISO 8601 layouts the providers emit with integer arithmetic only.
+    """
+    match = ISO.fullmatch(value)
+    if match is None:
+        return None
+    year, month, day, hour, minute, second = (int(group) for group in match.group(1, 2, 3, 4, 5, 6))
+    if not _valid(year, month, day, hour, minute, second):
+        return None
+    epoch = _days_from_civil(year, month, day) * 86400 + hour * 3600 + minute * 60 + second
+    zone = match.group(8)
+    if zone and zone != "Z":
+        offset = int(zone[1:3]) * 3600 + int(zone[-2:]) * 60
+        epoch += -offset if zone[0] == "+" else offset
+    return epoch
+
+
+def _parse_fallback(value: str) -> Optional[int]:
+    """
+    Slow path for any other textual format. Naive times are taken as UTC.
+    """
+    try:
+        if _dateutil_parse is not None:
+            dt = _dateutil_parse(value)
+        else:
+            dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except (ValueError, OverflowError, TypeError):
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp() // 1)
+
+
+@lru_cache(maxsize=1 << 16)
+def _parse(value: str) -> Optional[int]:
+    epoch = _parse_iso(value)
+    return epoch if epoch is not None else _parse_fallback(value)
+
+
+def to_epoch(value) -> Optional[int]:
+    """
+    Convert one provider timestamp to whole epoch seconds (UTC), None if it cannot be parsed.
+
+    Accepts epoch numbers, '2011-04-25 16:55:15+00:00', '2023-11-20T10:00:00.000Z' and the
+    other ISO 8601 layouts through a fixed-format fast path, and anything dateutil
+    understands through a memoized fallback.
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value // 1)
+    if not isinstance(value, str):
+        return None
+    return _parse(value)
+
+
+def to_epochs(values: list) -> List[Optional[int]]:
+    """
+    Convert a batch of timestamps with to_epoch(), parsing each distinct string once.
+    """
+    seen = {}
+    result = []
+    for value in values:
+        if isinstance(value, str):
+            epoch = seen.get(value)
+            if epoch is None and value not in seen:
+                epoch = seen[value] = _parse(value)
+            result.append(epoch)
+        else:
+            result.append(to_epoch(value))
+    return result
+
+
+def format_iso_millis(epoch) -> str:
+    """
+    Format epoch seconds as '2023-11-20T10:00:00.000Z', the reddit item timestamp format.
+    """
+    if not isinstance(epoch, int):
+        # Fractional seconds keep the exact rounding of datetime.
+        return datetime.utcfromtimestamp(epoch).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+    days, seconds = divmod(epoch, 86400)
+    year, month, day = _civil_from_days(days)
+    return f"{year:04d}-{month:02d}-{day:02d}T{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}.000Z"
+
+
+def to_utc_text(value: str) -> str:
+    """
+    Rewrite an ISO 8601 timestamp as str() of the aware datetime, e.g. '2023-11-20 10:00:00+00:00', the tweet timestamp format.
+    """
+    match = ISO.fullmatch(value)
+    if match is not None and match.group(8) in ("Z", "+00:00") and not (match.group(7) or "").strip("0"):
+        year, month, day, hour, minute, second = (int(group) for group in match.group(1, 2, 3, 4, 5, 6))
+        if _valid(year, month, day, hour, minute, second):
+            return f"{value[:10]} {value[11:19]}+00:00"
+    return str(datetime.fromisoformat(value.replace("Z", "+00:00")))
+
+
+if __name__ == "__main__":
+    # Microbenchmark: the fast path and the memoized batch conversion against dateutil.
+    import time
+    import random
+    start = 1700000000
+    samples = []
+    for i in range(50000):
+        epoch = start + random.randrange(0, 7 * 86400)
+        dt = datetime.fromtimestamp(epoch, timezone.utc)
+        samples.append(str(dt) if i % 2 else dt.strftime("%Y-%m-%dT%H:%M:%S.000Z"))
+    # Miners return overlapping items, so rounds repeat timestamps.
+    batch = [random.choice(samples[:20000]) for _ in range(len(samples))]
+
+    def bench(name, fn, values):
+        begin = time.perf_counter()
+        fn(values)
+        secs = time.perf_counter() - begin
+        print(f"{name:<28} {len(values) / secs / 1e6:8.3f} M/s  ({secs:.3f}s for {len(values)})")
+        return secs
+
+    unique = samples[:20000]
+    fast = bench("fast path, unique", lambda values: [_parse_iso(value) for value in values], unique)
+    if _dateutil_parse is not None:
+        slow = bench("dateutil, unique", lambda values: [int(_dateutil_parse(value).timestamp()) for value in values], unique)
+        print(f"fast path speedup: {slow / fast:.1f}x")
+        slow = bench("dateutil, batch", lambda values: [int(_dateutil_parse(value).timestamp()) for value in values], batch)
+    _parse.cache_clear()
+    batched = bench("to_epochs, batch", to_epochs, batch)
+    if _dateutil_parse is not None:
+        print(f"batch speedup: {slow / batched:.1f}x")
+    assert all(_parse_iso(value) == int(datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()) for value in unique)
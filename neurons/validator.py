@@ -23,7 +23,7 @@ DEALINGS IN THE SOFTWARE.
 import os
 import time
 import torch
-import csv
+import asyncio
 import argparse
 import traceback
 import bittensor as bt
@@ -32,9 +32,19 @@ import json
 import sys
 import score.reddit_score
 import score.twitter_score
+from neurons.score import configure as configure_scoring
 # import storage.store
 from apify_client import ApifyClient
 from neurons.queries import get_query, QueryType, QueryProvider
+from neurons.rounds import RoundScheduler, RoundSpec
+from neurons.scoring_pipeline import ScoringPipeline, ScoringJob
+from neurons.metagraph_sync import MetagraphSync
+from neurons.weight_setter import WeightSetter
+from neurons.score_journal import ScoreJournal, resize_scores
+from neurons.sampler import CoverageSampler
+from neurons.intake import collect
+from neurons.scoring_log import ScoringLog
+from neurons.keywords import KeywordSampler
 
 
 # This function is responsible for setting up and parsing command-line arguments.
@@ -48,7 +58,35 @@ def get_config():
 
     # Adds override arguments for network and netuid.
     parser.add_argument( '--netuid', type = int, default = 1, help = "The chain subnet uid." )
-    parser.add_argument( '--save_scoring', type = bool, default = False, help = "Write scoring debug data to csv files" )
+    parser.add_argument( '--save_scoring', type = bool, default = False, help = "Write scoring debug data to daily compressed jsonl files" )
+    parser.add_argument( '--scoring_log_queue', type = int, default = 64, help = "Maximum number of scoring debug records waiting to be written before new ones are dropped." )
+    parser.add_argument( '--neuron.miners_per_round', type = int, default = 25, help = "Maximum number of miners queried in one round." )
+    parser.add_argument( '--neuron.twitter_interval', type = float, default = 120, help = "Seconds between the starts of two twitter rounds." )
+    parser.add_argument( '--neuron.twitter_concurrency', type = int, default = 2, help = "Maximum number of twitter rounds running at once." )
+    parser.add_argument( '--neuron.reddit_interval', type = float, default = 120, help = "Seconds between the starts of two reddit rounds." )
+    parser.add_argument( '--neuron.reddit_concurrency', type = int, default = 2, help = "Maximum number of reddit rounds running at once." )
+    parser.add_argument( '--neuron.scoring_workers', type = int, default = 2, help = "Number of processes scoring rounds." )
+    parser.add_argument( '--neuron.scoring_queue', type = int, default = 8, help = "Maximum number of rounds waiting to be scored." )
+    parser.add_argument( '--neuron.weights_interval', type = int, default = 100, help = "Blocks between two weight submissions." )
+    parser.add_argument( '--neuron.weights_retry_base', type = float, default = 12.0, help = "Seconds to wait before retrying a failed weight submission, doubled after each failure." )
+    parser.add_argument( '--neuron.weights_retry_max', type = float, default = 600.0, help = "Maximum seconds between weight submission retries." )
+    parser.add_argument( '--neuron.query_deadline', type = float, default = 60, help = "Seconds after which a round stops waiting for miners." )
+    parser.add_argument( '--neuron.quorum', type = float, default = 1.0, help = "Fraction of miners whose answers close a round before the deadline." )
+    parser.add_argument( '--neuron.max_connections', type = int, default = 16, help = "Maximum number of open miner connections per round." )
+    parser.add_argument( '--neuron.timeout_score', type = float, default = 0.0, help = "Round score given to miners that did not answer before the round closed." )
+    parser.add_argument( '--neuron.verification_ttl', type = float, default = 7 * 24 * 3600, help = "Seconds a spot-checked item fetched from an external service stays cached." )
+    parser.add_argument( '--neuron.verification_max_entries', type = int, default = 200000, help = "Maximum number of spot-checked items kept in the verification cache." )
+    parser.add_argument( '--neuron.verification_batch_size', type = int, default = 20, help = "Items spot-checked by one call to an external service." )
+    parser.add_argument( '--neuron.verification_calls', type = int, default = 5, help = "Calls to an external service one round may spend on spot checks." )
+    parser.add_argument( '--neuron.verification_confidence', type = float, default = 0.9, help = "Confidence at which spot checks of a miner stop early." )
+    parser.add_argument( '--neuron.verification_deadline', type = float, default = 40, help = "Seconds a round may spend fetching spot-checked items; lookups still running then are aborted." )
+    parser.add_argument( '--neuron.verification_concurrency', type = int, default = 4, help = "Maximum number of spot check lookups running at once on each external service." )
+    parser.add_argument( '--neuron.verification_hedge_after', type = float, default = 20, help = "Seconds after which a slow tweet lookup is also sent to the fallback scraper." )
+    parser.add_argument( '--neuron.verification_retries', type = int, default = 1, help = "How many times a tweet missing from a lookup is looked up again." )
+    parser.add_argument( '--neuron.min_revisit', type = float, default = 600, help = "Seconds before a scored miner is preferred for another round." )
+    parser.add_argument( '--neuron.checkpoint_rounds', type = int, default = 100, help = "Write a score checkpoint after this many journaled rounds." )
+    parser.add_argument( '--neuron.journal_segments', type = int, default = 48, help = "Number of score journal segments kept as history." )
+    parser.add_argument( '--neuron.metagraph_stale_blocks', type = int, default = 10, help = "Re-sync the metagraph once it is this many blocks behind the chain." )
 
     # Adds subtensor specific arguments i.e. --subtensor.chain_endpoint ... --subtensor.network ...
     bt.subtensor.add_args(parser)
@@ -77,15 +115,6 @@ def get_config():
     return config
 
 
-import random
-
-def random_line(a_file="keywords.txt"):
-    if not os.path.exists(a_file):
-        bt.logging.error(f"Keyword file not found at location: {a_file}")
-        exit(1)
-    lines = open(a_file).read().splitlines()
-    return random.choice(lines)
-
 def main( config ):
     """
     This is the main function that sets up logging, initializes bittensor objects, and starts the validator loop.
@@ -133,12 +162,15 @@ def main( config ):
     metagraph.sync(subtensor = subtensor)
     bt.logging.info(f"Metagraph: {metagraph}")
 
-    if wallet.hotkey.ss58_address not in metagraph.hotkeys:
+    # Keeps a snapshot of the metagraph fresh in the background; rounds read it without chain calls.
+    metagraph_sync = MetagraphSync(subtensor, config.netuid, metagraph = metagraph, stale_blocks = config.neuron.metagraph_stale_blocks)
+
+    if not metagraph_sync.snapshot.is_registered(wallet.hotkey.ss58_address):
         bt.logging.error(f"\nYour validator: {wallet} if not registered to chain connection: {subtensor} \nRun btcli register and try again.")
         exit()
     else:
         # Each miner gets a unique identity (UID) in the network for differentiation.
-        my_subnet_uid = metagraph.hotkeys.index(wallet.hotkey.ss58_address)
+        my_subnet_uid = metagraph_sync.snapshot.uid_of(wallet.hotkey.ss58_address)
         bt.logging.info(f"Running validator on uid: {my_subnet_uid}")
 
     bt.logging.info("Building validation weights.")
@@ -147,46 +179,71 @@ def main( config ):
     redditAlpha = 0.7
     twitterAlpha = 0.7
 
-    # Restore weights, or initialize weights for each miner to 0.
-    scores_file = "scores.pt"
-    try:
-        scores = torch.load(scores_file)
-        bt.logging.info(f"Loaded scores from save file: {scores}")
-    except:
-        scores = torch.zeros_like(metagraph.S, dtype=torch.float32)
-        bt.logging.info(f"Initialized all scores to 0")
+    # Restore weights from the score journal, or initialize weights for each miner to 0.
+    score_journal = ScoreJournal(
+        os.path.join(config.full_path, "scores"),
+        checkpoint_every = config.neuron.checkpoint_rounds,
+        keep_segments = config.neuron.journal_segments,
+    )
+    scores = score_journal.restore(metagraph_sync.snapshot.hotkeys)
+    if scores is not None:
+        bt.logging.info(f"Loaded scores from journal: {scores}")
+    else:
+        # Fall back to the save file written by earlier versions.
+        scores_file = "scores.pt"
+        try:
+            scores = torch.load(scores_file)
+            bt.logging.info(f"Loaded scores from save file: {scores}")
+        except:
+            scores = torch.zeros_like(metagraph.S, dtype=torch.float32)
+            bt.logging.info(f"Initialized all scores to 0")
+        # The save file may predate registrations or deregistrations.
+        if len(scores) != len(metagraph_sync.snapshot.hotkeys):
+            bt.logging.warning(f"Save file has {len(scores)} scores for {len(metagraph_sync.snapshot.hotkeys)} uids, resizing")
+            scores = resize_scores(scores, len(metagraph_sync.snapshot.hotkeys))
 
 
-    curr_block = subtensor.block
+    curr_block = metagraph_sync.block
 
     # all nodes with more than 1e3 total stake are set to 0 (sets validators weights to 0)
 
     # set all nodes without ips set to 0
-    scores = scores * torch.Tensor([metagraph.neurons[uid].axon_info.ip != '0.0.0.0' for uid in metagraph.uids])
+    scores = scores * metagraph_sync.snapshot.serving
     step = 0
     
     # Fetch protocol version for inclusion in queries
     my_version = scraping.utils.get_my_version()
 
+    # Keywords are kept in memory and reloaded when the file changes.
+    keyword_sampler = KeywordSampler("keywords.txt")
+    if len(keyword_sampler) == 0:
+        bt.logging.error(f"Keyword file not found at location: {keyword_sampler.path}")
+        exit(1)
+
+    # Picks the miners of each round by how long ago they were scored, and keeps their spot
+    # check records; both are seeded from the journal.
+    sampler = CoverageSampler(min_revisit = config.neuron.min_revisit)
+    for record in score_journal.read_history():
+        if record["source"] != "reset":
+            sampler.observe(record["uid"], record["hotkey"], record["score"], record["time"])
+            if "checked" in record:
+                sampler.observe_checks(record["uid"], record["hotkey"], record["checked"], record["failed"])
+    sampler.sync(metagraph_sync.snapshot.hotkeys)
+
     bt.logging.info(f"Initial scores: {scores}")
     bt.logging.info("Starting validator loop.")
     
-    total_dendrites_per_query = 25
+    total_dendrites_per_query = config.neuron.miners_per_round
     minimum_dendrites_per_query = 3
-    last_updated_block = 0 #curr_block - (curr_block % 100)
     last_reset_weights_block = curr_block
 
-
-    # Main loop
-    while True:
-        # Per 10 blocks, sync the subtensor state with the blockchain.
-        if step % 5 == 0:
-            metagraph.sync(subtensor = subtensor)
-            bt.logging.info(f"🔄 Syncing metagraph with subtensor.")
-
-        # If the metagraph has changed, update the weights.
+    def select_uids(snapshot, exclude: set) -> list:
+        """
+        Pick a subset of queryable miners, skipping those already taking part in a round.
+        """
+        nonlocal scores
         # Get the uids of all miners in the network.
-        uids = metagraph.uids.tolist()
+        uids = snapshot.uids
         # If there are more uids than scores, add more weights.
         if len(uids) > len(scores):
             bt.logging.trace("Adding more weights")
@@ -195,13 +252,11 @@ def main( config ):
             scores = torch.cat((scores, new_scores))
             del new_scores
         # If there are less uids than scores, remove some weights.
-        queryable_uids = (metagraph.total_stake >= 0)
-        bt.logging.info(f"queryable_uids:{queryable_uids}")
-        
+        queryable_uids = (snapshot.metagraph.total_stake >= 0)
+
         # Remove the weights of miners that are not queryable.
-        queryable_uids = queryable_uids * torch.Tensor([metagraph.neurons[uid].axon_info.ip != '0.0.0.0' for uid in uids])
+        queryable_uids = queryable_uids * snapshot.serving
         active_miners = torch.sum(queryable_uids)
-        dendrites_per_query = total_dendrites_per_query
 
         # if there are no active miners, set active_miners to 1
         if active_miners == 0:
@@ -211,231 +266,259 @@ def main( config ):
             dendrites_per_query = int(active_miners / 3)
         else:
             dendrites_per_query = total_dendrites_per_query
-        
+
         # less than 3 set to 3
         if dendrites_per_query < minimum_dendrites_per_query:
                 dendrites_per_query = minimum_dendrites_per_query
-        # zip uids and queryable_uids, filter only the uids that are queryable, unzip, and get the uids
-        zipped_uids = list(zip(uids, queryable_uids))
-        filtered_uids = list(zip(*filter(lambda x: x[1], zipped_uids)))[0]
+        # filter only the uids that are queryable and not busy in another round
+        filtered_uids = [uid for uid, queryable in zip(uids, queryable_uids) if queryable and uid not in exclude]
         bt.logging.info(f"filtered_uids:{filtered_uids}")
-        dendrites_to_query = random.sample( filtered_uids, min( dendrites_per_query, len(filtered_uids) ) )
-        bt.logging.info(f"dendrites_to_query:{dendrites_to_query}")
-        
-        # every 2 minutes, query the miners
+        return sampler.select( filtered_uids, dendrites_per_query )
+
+    # Scoring debug records go to daily compressed files, written off the event loop.
+    scoring_log = ScoringLog(os.path.join(config.full_path, "scoring"), max_queue = config.scoring_log_queue) if config.save_scoring else None
+
+    def save_scoring(job: ScoringJob, scoring_metrics: dict):
+        """
+        Queue the scoring debug data of one round for the scoring log.
+        """
+        scoring_log.write({
+            "time": time.time(),
+            "block": metagraph_sync.block,
+            "source": job.spec.name,
+            "search_key": job.search_key,
+            "uids": job.uids,
+            "hotkeys": [metagraph_sync.snapshot.hotkeys[uid] if uid < len(metagraph_sync.snapshot.hotkeys) else None for uid in job.uids],
+            "timed_out": job.timed_out,
+            "query_secs": job.query_secs,
+            "metrics": scoring_metrics,
+            "responses": job.responses,
+        })
+
+    async def run_round(spec: RoundSpec):
+        """
+        Query a subset of miners with one synapse and queue their responses for scoring.
+        """
+        # Use one snapshot for the whole round, even if a newer one is swapped in meanwhile.
+        snapshot = metagraph_sync.snapshot
+        dendrites_to_query = select_uids(snapshot, scheduler.busy_uids)
+        if len(dendrites_to_query) == 0:
+            bt.logging.info(f"No miners available for a {spec.name} round.")
+            return
+        scheduler.reserve(dendrites_to_query)
         try:
+            bt.logging.info(f"{spec.name} dendrites_to_query:{dendrites_to_query}")
             # Filter metagraph.axons by indices saved in dendrites_to_query list
-            filtered_axons = [metagraph.axons[i] for i in dendrites_to_query]
-            bt.logging.info(f"filtered_axons: {filtered_axons}")
-            # Broadcast a GET_DATA query to filtered miners on the network.
-
-            # * every 10 minutes, query the miners for twitter data
-            if step % 4 == 2:
-                search_key = random_line()
-                bt.logging.info(f"\033[92m 𝕏 ⏩ Sending tweeter query ({search_key}). \033[0m")
-                responses = dendrite.query(
-                    filtered_axons,
-                    # Construct a scraping query.
-                    scraping.protocol.TwitterScrap(scrap_input = {"search_key" : [search_key]}, version = my_version), # Construct a scraping query.
-                    # All responses have the deserialize function called on them before returning.
-                    deserialize = True, 
-                    timeout = 60
-                )
-
-                # Update score
-                new_scores = []
-                try:
-                    if(len(responses) > 0 and responses is not None):
-                        scoring_metrics = score.twitter_score.calculateScore(responses = responses, tag = search_key)
-                        for metric in scoring_metrics:
-                            bt.logging.info(f'{metric} = {scoring_metrics[metric]}')
-
-                        new_scores = scoring_metrics["normalized_scores"]
-                        bt.logging.info(f"✅ new_scores: {new_scores}")
-
-                        if config.save_scoring:
-                            dir = f'twitter_block_{subtensor.block}'
-                            os.mkdir(dir)
-                            with open(f'{dir}/scoring.csv', 'w') as csvfile:
-                                writer = csv.writer(csvfile)
-                                writer.writerow(['uid'] + dendrites_to_query)
-                                for metric in scoring_metrics:
-                                    writer.writerow([metric] + list(v.item() for v in scoring_metrics[metric]))
-
-                            ranks = list(torch.argsort(new_scores))
-                            for idx, node in enumerate(dendrites_to_query):
-                                rank = ranks.index(idx)
-                                filename = f"{dir}/{search_key}_{rank}_{node}.json"
-                                bt.logging.info(f"Writing results to: {filename}")
-                                with open(filename , "w") as write:
-                                    json.dump(responses[idx], write)
-
-                        
-                except Exception as e:
-                    bt.logging.error(f"❌ Error in twitterScore: {e}")
-                for i, score_i in enumerate(new_scores):
-                    scores[dendrites_to_query[i]] = twitterAlpha * scores[dendrites_to_query[i]] + (1 - twitterAlpha) * score_i
-                bt.logging.info(f"\033[92m ✓ Updated Scores: {scores} \033[0m")
-                
-#                 try:
-#                     if len(responses) > 0:
-#                         indexing_result = storage.store.twitter_store(data = responses, search_keys=[search_key])
-#                         bt.logging.info(f"\033[92m saving index info: {indexing_result} \033[0m")
-#                     else:
-#                         bt.logging.warning("\033[91m ⚠ No twitter data found in responses \033[0m")
-#                 except Exception as e:
-#                     bt.logging.error(f"❌ Error in store_Twitter: {e}")
-
-                    
-                        
-                current_block = subtensor.block
-                if current_block - last_updated_block > 100:
-                    
-                    weights = scores / torch.sum(scores)
-                    bt.logging.info(f"Setting weights: {weights}")
-                    # Miners with higher scores (or weights) receive a larger share of TAO rewards on this subnet.
-                    (
-                        processed_uids,
-                        processed_weights,
-                    ) = bt.utils.weight_utils.process_weights_for_netuid(
-                        uids=metagraph.uids,
-                        weights=weights,
-                        netuid=config.netuid,
-                        subtensor=subtensor
-                    )
-                    bt.logging.info(f"Processed weights: {processed_weights}")
-                    bt.logging.info(f"Processed uids: {processed_uids}")
-                    result = subtensor.set_weights(
-                        netuid = config.netuid, # Subnet to set weights on.
-                        wallet = wallet, # Wallet to sign set weights using hotkey.
-                        uids = processed_uids, # Uids of the miners to set weights for.
-                        weights = processed_weights, # Weights to set for the miners.
-                    )
-                    last_updated_block = current_block
-                    if result: bt.logging.success('✅ Successfully set weights.')
-                    else: bt.logging.error('Failed to set weights.')
-
-            # Periodically update the weights on the Bittensor blockchain.
-            if step % 4 == 0:
-                bt.logging.info(f"\033[92m ᕕ ⏩ Sending reddit query. \033[0m")
-                search_key = random_line()
-                responses = dendrite.query(
-                    filtered_axons,
-                    # Construct a scraping query.
-                    scraping.protocol.RedditScrap(scrap_input = {"search_key" : [search_key]}, version = my_version), # Construct a scraping query.
-                    # All responses have the deserialize function called on them before returning.
-                    deserialize = True,
-                    timeout = 60 
-                )
-
-                # Update score
-                new_scores = []
-                try:
-                    if(len(responses) > 0 and responses is not None):
-                        scoring_metrics = score.reddit_score.calculateScore(responses = responses, tag = search_key)
-                        for metric in scoring_metrics:
-                            bt.logging.info(f'{metric} = {scoring_metrics[metric]}')
-
-                        new_scores = scoring_metrics["normalized_scores"]
-                        bt.logging.info(f"✅ new_scores: {new_scores}")
-
-                        if config.save_scoring:
-                            dir = f'reddit_block_{subtensor.block}'
-                            os.mkdir(dir)
-                            with open(f'{dir}/scoring.csv', 'w') as csvfile:
-                                writer = csv.writer(csvfile)
-                                writer.writerow(['uid'] + dendrites_to_query)
-                                for metric in scoring_metrics:
-                                    writer.writerow([metric] + list(v.item() for v in scoring_metrics[metric]))
-
-                            ranks = list(torch.argsort(new_scores))
-                            for idx, node in enumerate(dendrites_to_query):
-                                rank = ranks.index(idx)
-                                filename = f"{dir}/{search_key}_{rank}_{node}.json"
-                                bt.logging.info(f"Writing results to: {filename}")
-                                with open(filename , "w") as write:
-                                    json.dump(responses[idx], write)
-
-                except Exception as e:
-                    bt.logging.error(f"❌ Error in redditScore: {e}")
-                    traceback.print_exc()
-
-                for i, score_i in enumerate(new_scores):
-                    scores[dendrites_to_query[i]] = redditAlpha * scores[dendrites_to_query[i]] + (1 - redditAlpha) * score_i
-                bt.logging.info(f"\033[92m ✓ Updated Scores: {scores} \033[0m")
-                try:
-#                     if len(responses) > 0:
-#                         indexing_result = storage.store.reddit_store(data = responses, search_keys=[search_key])
-#                         bt.logging.info(f"\033[92m saving index info: {indexing_result} \033[0m")
-#                     else:
-#                         bt.logging.warning("\033[91m ⚠ No reddit data found in responses \033[0m")
-#                 except Exception as e:
-#                     bt.logging.error(f"❌ Error in store_reddit: {e}")            
-                
-                # If the metagraph has changed, update the weights.
-                # Adjust the scores based on responses from miners.
-                # weights = torch.nn.functional.normalize(scores, p=1.0, dim=0)
-                current_block = subtensor.block
-                if current_block - last_updated_block > 100:
-                    
-                    weights = scores / torch.sum(scores)
-                    bt.logging.info(f"Setting weights: {weights}")
-                    # Miners with higher scores (or weights) receive a larger share of TAO rewards on this subnet.
-                    (
-                        processed_uids,
-                        processed_weights,
-                    ) = bt.utils.weight_utils.process_weights_for_netuid(
-                        uids=metagraph.uids,
-                        weights=weights,
-                        netuid=config.netuid,
-                        subtensor=subtensor
-                    )
-                    bt.logging.info(f"Processed weights: {processed_weights}")
-                    bt.logging.info(f"Processed uids: {processed_uids}")
-                    result = subtensor.set_weights(
-                        netuid = config.netuid, # Subnet to set weights on.
-                        wallet = wallet, # Wallet to sign set weights using hotkey.
-                        uids = processed_uids, # Uids of the miners to set weights for.
-                        weights = processed_weights, # Weights to set for the miners.
-                    )
-                    last_updated_block = current_block
-                    if result: bt.logging.success('✅ Successfully set weights.')
-                    else: bt.logging.error('Failed to set weights.')
-
-            step += 1
-
-            if last_reset_weights_block + 1800 < current_block:
-                bt.logging.trace(f"Clearing weights for validators and nodes without IPs")
-                last_reset_weights_block = current_block
-
-                
-                # set all nodes without ips set to 0
-                scores = scores * torch.Tensor([metagraph.neurons[uid].axon_info.ip != '0.0.0.0' for uid in metagraph.uids])
-
-            # Resync our local state with the latest state from the blockchain.
-            metagraph = subtensor.metagraph(config.netuid)
-            torch.save(scores, scores_file)
-            bt.logging.info(f"Saved weights to \"{scores_file}\"")
-            
-            # Check for auto update
-            if config.auto_update != "no":
-                if scraping.utils.update_repository(config.auto_update):
-                    bt.logging.success("🔁 Repository updated, exiting validator")
-                    exit(0)
+            filtered_axons = [snapshot.axons[i] for i in dendrites_to_query]
+
+            search_key = keyword_sampler.sample()
+            bt.logging.info(f"\033[92m ⏩ Sending {spec.name} query ({search_key}). \033[0m")
+            # Take responses in as they arrive; the round closes at the quorum or the deadline.
+            intake = await collect(
+                dendrite,
+                filtered_axons,
+                spec.synapse(search_key),
+                deadline = config.neuron.query_deadline,
+                quorum = config.neuron.quorum,
+                max_connections = config.neuron.max_connections,
+            )
+        finally:
+            scheduler.release(dendrites_to_query)
+
+        bt.logging.info(f"{spec.name} round closed after {intake.secs:.1f}s | timed out: {[dendrites_to_query[i] for i in intake.timed_out]}")
+        # Spot checks are planned from each miner's earlier checks.
+        history = [sampler.check_history(uid, snapshot.hotkeys[uid]) for uid in dendrites_to_query]
+        # Scoring runs in worker processes; the next round's query does not wait for it.
+        await pipeline.submit(ScoringJob(spec, dendrites_to_query, search_key, intake.responses, intake.secs, timed_out = intake.timed_out, history = history))
+
+    def apply_scores(job: ScoringJob, scoring_metrics: dict):
+        """
+        Fold a scored round into the miners' moving average scores. Called in round order.
+        """
+        nonlocal scores
+        if scoring_metrics is None:
+            return
+        for metric in scoring_metrics:
+            bt.logging.info(f'{metric} = {scoring_metrics[metric]}')
+
+        new_scores = scoring_metrics["normalized_scores"]
+        bt.logging.info(f"✅ new_scores: {new_scores}")
+
+        if scoring_log is not None:
+            save_scoring(job, scoring_metrics)
+
+        hotkeys = metagraph_sync.snapshot.hotkeys
+        timed_out = set(job.timed_out)
+        entries, checks = [], []
+        for i, score_i in enumerate(new_scores):
+            uid = job.uids[i]
+            if i in timed_out:
+                score_i = config.neuron.timeout_score
+            scores[uid] = job.spec.alpha * scores[uid] + (1 - job.spec.alpha) * score_i
+            hotkey = hotkeys[uid] if uid < len(hotkeys) else None
+            entries.append((uid, hotkey, score_i, scores[uid]))
+            sampler.observe(uid, hotkey, score_i)
+            if "checked" in scoring_metrics and scoring_metrics["checked"][i] > 0:
+                checks.append((int(scoring_metrics["checked"][i]), int(scoring_metrics["failed"][i])))
+                sampler.observe_checks(uid, hotkey, *checks[-1])
+            else:
+                checks.append(None)
+        bt.logging.info(f"\033[92m ✓ Updated Scores: {scores} \033[0m")
+        # Spot check counts are journaled too, so the check history survives a restart.
+        score_journal.append(metagraph_sync.block, job.spec.name, entries, alpha = job.spec.alpha, checks = checks)
+
+    def set_weights() -> bool:
+        """
+        Normalize the latest scores and set them as weights on chain. Runs in a worker thread.
+        """
+        # Copy first: rounds keep updating scores on the event loop meanwhile.
+        latest = scores.clone()
+        weights = latest / torch.sum(latest)
+        bt.logging.info(f"Setting weights: {weights}")
+        with metagraph_sync.chain_lock:
+            # Miners with higher scores (or weights) receive a larger share of TAO rewards on this subnet.
+            (
+                processed_uids,
+                processed_weights,
+            ) = bt.utils.weight_utils.process_weights_for_netuid(
+                uids=metagraph_sync.snapshot.metagraph.uids,
+                weights=weights,
+                netuid=config.netuid,
+                subtensor=subtensor
+            )
+            bt.logging.info(f"Processed weights: {processed_weights}")
+            bt.logging.info(f"Processed uids: {processed_uids}")
+            result = subtensor.set_weights(
+                netuid = config.netuid, # Subnet to set weights on.
+                wallet = wallet, # Wallet to sign set weights using hotkey.
+                uids = processed_uids, # Uids of the miners to set weights for.
+                weights = processed_weights, # Weights to set for the miners.
+            )
+        if result: bt.logging.success('✅ Successfully set weights.')
+        else: bt.logging.error('Failed to set weights.')
+        return result
+
+    async def maintain():
+        """
+        Periodically reset and save scores while rounds run.
+        """
+        nonlocal scores, step, last_reset_weights_block
+        while True:
+            try:
+                # The block is polled by the metagraph sync task, so reading it costs no chain call.
+                current_block = metagraph_sync.block
+                # A re-registered uid starts with no coverage or spot check record.
+                forgotten = sampler.sync(metagraph_sync.snapshot.hotkeys)
+                if len(forgotten) > 0:
+                    bt.logging.info(f"Cleared sampler history of re-registered uids: {forgotten}")
+                if last_reset_weights_block + 1800 < current_block:
+                    bt.logging.trace(f"Clearing weights for validators and nodes without IPs")
+                    last_reset_weights_block = current_block
+
+                    # set all nodes without ips set to 0
+                    snapshot = metagraph_sync.snapshot
+                    if len(snapshot.serving) != len(scores):
+                        bt.logging.warning(f"Resizing {len(scores)} scores to the {len(snapshot.serving)} uids of the metagraph")
+                        scores = resize_scores(scores, len(snapshot.serving))
+                    cleared = [uid for uid in snapshot.uids if snapshot.serving[uid] == 0 and scores[uid] != 0]
+                    scores = scores * snapshot.serving
+                    score_journal.append(current_block, "reset", [(uid, snapshot.hotkeys[uid], 0.0, 0.0) for uid in cleared])
+
+                if score_journal.checkpoint_due():
+                    score_journal.checkpoint(current_block, scores, metagraph_sync.snapshot.hotkeys)
+                    bt.logging.info(f"Saved score checkpoint to \"{score_journal.directory}\"")
+                bt.logging.info(f"Rounds started: {scheduler.started} | running: {scheduler.running} | scoring: {pipeline.stats()}")
+                bt.logging.info(f"Weights: {weight_setter.stats()}")
+                if scoring_log is not None:
+                    bt.logging.info(f"Scoring log: {scoring_log.stats()}")
+                serving_uids = [uid for uid in metagraph_sync.snapshot.uids if metagraph_sync.snapshot.serving[uid] != 0]
+                bt.logging.info(f"Coverage: {sampler.coverage(serving_uids)}")
+                bt.logging.info(f"Metagraph block: {metagraph_sync.snapshot.block} | chain block: {metagraph_sync.block} | syncs: {metagraph_sync.syncs} | sync errors: {metagraph_sync.sync_errors}")
+
+                # Check for auto update
+                if config.auto_update != "no":
+                    if scraping.utils.update_repository(config.auto_update):
+                        bt.logging.success("🔁 Repository updated, exiting validator")
+                        exit(0)
+                step += 1
+            except Exception as e:
+                bt.logging.error(e)
+                traceback.print_exc()
             # Sleep for a duration equivalent to the block time (i.e., time between successive blocks).
-            time.sleep(bt.__blocktime__ * 10)
-
-        # If we encounter an unexpected error, log it for debugging.
-        except RuntimeError as e:
-            bt.logging.error(e)
-            traceback.print_exc()
-        except Exception as e:
-            bt.logging.error(e)
-            continue
-        # If the user interrupts the program, gracefully exit.
-        except KeyboardInterrupt:
-            bt.logging.success("Keyboard interrupt detected. Exiting validator.")
-            exit()
+            await asyncio.sleep(bt.__blocktime__ * 10)
+
+    scheduler = RoundScheduler(
+        specs = [
+            RoundSpec(
+                name = "twitter",
+                interval = config.neuron.twitter_interval,
+                concurrency = config.neuron.twitter_concurrency,
+                synapse = lambda search_key: scraping.protocol.TwitterScrap(scrap_input = {"search_key" : [search_key]}, version = my_version),
+                scorer = score.twitter_score.calculateScore,
+                alpha = twitterAlpha,
+            ),
+            RoundSpec(
+                name = "reddit",
+                interval = config.neuron.reddit_interval,
+                concurrency = config.neuron.reddit_concurrency,
+                synapse = lambda search_key: scraping.protocol.RedditScrap(scrap_input = {"search_key" : [search_key]}, version = my_version),
+                scorer = score.reddit_score.calculateScore,
+                alpha = redditAlpha,
+            ),
+        ],
+        run_round = run_round,
+    )
+
+    weight_setter = WeightSetter(
+        submit = set_weights,
+        current_block = lambda: metagraph_sync.block,
+        interval_blocks = config.neuron.weights_interval,
+        retry_base = config.neuron.weights_retry_base,
+        retry_max = config.neuron.weights_retry_max,
+    )
+
+    # Each scoring process is told once where the verification cache lives and how many spot checks a round may afford.
+    cache_settings = {
+        "path": os.path.join(config.full_path, "verification_cache.db"),
+        "ttl": config.neuron.verification_ttl,
+        "max_entries": config.neuron.verification_max_entries,
+    }
+    planner_settings = {
+        "batch_size": config.neuron.verification_batch_size,
+        "max_calls": config.neuron.verification_calls,
+        "target": config.neuron.verification_confidence,
+        "deadline": config.neuron.verification_deadline,
+        "concurrency": config.neuron.verification_concurrency,
+        "hedge_after": config.neuron.verification_hedge_after,
+        "retries": config.neuron.verification_retries,
+    }
+
+    pipeline = None
+
+    async def run():
+        nonlocal pipeline
+        # Created inside the running loop so its queues belong to it.
+        pipeline = ScoringPipeline(
+            apply = apply_scores,
+            workers = config.neuron.scoring_workers,
+            max_queue = config.neuron.scoring_queue,
+            initializer = configure_scoring,
+            initargs = (cache_settings, planner_settings),
+        )
+        try:
+            await asyncio.gather(metagraph_sync.run(), scheduler.run(), pipeline.run(), weight_setter.run(), maintain())
+        finally:
+            pipeline.shutdown()
+            score_journal.close()
+            if scoring_log is not None:
+                scoring_log.close()
+
+    try:
+        asyncio.run(run())
+    # If the user interrupts the program, gracefully exit.
+    except KeyboardInterrupt:
+        bt.logging.success("Keyboard interrupt detected. Exiting validator.")
+        exit()
         
 # The main function parses the configuration and runs the validator.
 if __name__ == "__main__":
@@ -0,0 +1,120 @@
+"""
+The MIT License (MIT)
+Copyright © 2023 Chris Wilson
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+the Software.
+
+THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+import time
+import asyncio
+import traceback
+from typing import Callable
+import bittensor as bt
+
+
+class WeightSetter:
+    """
+    Sets weights on chain from a background task, on a block-based schedule.
+
+    A submission runs in a worker thread so query rounds never wait on the extrinsic.
+    Failed submissions are retried with exponential backoff until one succeeds, after
+    which the next submission is due `interval_blocks` later.
+    """
+
+    def __init__(self, submit: Callable[[], bool], current_block: Callable[[], int], interval_blocks: int = 100, retry_base: float = 12.0, retry_max: float = 600.0, poll_interval: float = None):
+        """
+        Args:
+            submit (Callable): Sets weights from the latest scores and returns whether the chain accepted them.
+            current_block (Callable): Returns the latest known block without a chain call.
+            interval_blocks (int): Blocks between two successful submissions.
+            retry_base (float): Seconds to wait after the first failure; doubled after each further failure.
+            retry_max (float): Upper bound of the wait between retries.
+            poll_interval (float, optional): Seconds between schedule checks, one block time by default.
+        """
+        self.submit = submit
+        self.current_block = current_block
+        self.interval_blocks = interval_blocks
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.poll_interval = bt.__blocktime__ if poll_interval is None else poll_interval
+        self.last_set_block = None
+        self.attempts = 0
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.last_latency = None
+        self.mean_latency = None
+
+    def due(self) -> bool:
+        """
+        Return whether a submission is due at the current block.
+        """
+        return self.last_set_block is None or self.current_block() - self.last_set_block > self.interval_blocks
+
+    def backoff(self) -> float:
+        """
+        Return the seconds to wait before retrying after the current run of failures.
+        """
+        return min(self.retry_base * 2 ** (self.consecutive_failures - 1), self.retry_max)
+
+    async def run(self):
+        """
+        Submit weights whenever they are due, retrying failures with backoff, until cancelled.
+        """
+        loop = asyncio.get_event_loop()
+        while True:
+            if not self.due():
+                await asyncio.sleep(self.poll_interval)
+                continue
+
+            self.attempts += 1
+            block = self.current_block()
+            start = time.time()
+            try:
+                ok = await loop.run_in_executor(None, self.submit)
+            except Exception as e:
+                bt.logging.error(f"❌ Error setting weights: {e}")
+                traceback.print_exc()
+                ok = False
+            self._record(time.time() - start)
+
+            if ok:
+                self.successes += 1
+                self.consecutive_failures = 0
+                self.last_set_block = block
+                await asyncio.sleep(self.poll_interval)
+            else:
+                self.failures += 1
+                self.consecutive_failures += 1
+                delay = self.backoff()
+                bt.logging.warning(f"Setting weights failed {self.consecutive_failures} time(s) in a row, retrying in {delay:.0f}s")
+                await asyncio.sleep(delay)
+
+    def _record(self, secs: float, alpha: float = 0.2):
+        self.last_latency = secs
+        self.mean_latency = secs if self.mean_latency is None else alpha * secs + (1 - alpha) * self.mean_latency
+
+    def stats(self) -> dict:
+        """
+        Return submission counters, the last successful block and submission latencies in seconds.
+        """
+        return {
+            "attempts": self.attempts,
+            "successes": self.successes,
+            "failures": self.failures,
+            "last_set_block": self.last_set_block,
+            "last_latency": None if self.last_latency is None else round(self.last_latency, 3),
+            "mean_latency": None if self.mean_latency is None else round(self.mean_latency, 3),
+        }
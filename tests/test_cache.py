@@ -0,0 +1,65 @@
+import threading
+import time
+import concurrent.futures
+import pytest
+from neurons.cache import ResultCache, SingleFlight, cache_key
+
+
+def test_cache_key_normalizes_keywords():
+    assert cache_key("twitter", ["Bitcoin "]) == cache_key("twitter", "bitcoin")
+    assert cache_key("twitter", ["btc"]) != cache_key("reddit", ["btc"])
+
+
+def test_concurrent_calls_share_one_fetch():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return "value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("key", fetch, timeout=5))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["value"] * 4
+    assert len(calls) == 1
+    assert flight.leaders == 1 and flight.followers == 3
+
+
+def test_leader_times_out_and_the_fetch_still_fills_the_cache():
+    cache = ResultCache(ttl=60)
+    release = threading.Event()
+
+    def fetch():
+        release.wait(5)
+        return ["tweet"]
+
+    with pytest.raises(concurrent.futures.TimeoutError):
+        cache.get_or_fetch("key", fetch, timeout=0.05)
+    release.set()
+    for _ in range(100):
+        if cache.get("key") is not None:
+            break
+        time.sleep(0.01)
+    assert cache.get("key") == ["tweet"]
+    assert cache.get_or_fetch("key", fetch, timeout=0.05) == ["tweet"]
+
+
+def test_stale_entries_are_served_and_refreshed():
+    cache = ResultCache(ttl=0, stale_ttl=60)
+    cache.put("key", "old")
+    assert cache.get_or_fetch("key", lambda: "new") == "old"
+    for _ in range(100):
+        if cache.get("key") == "new":
+            break
+        time.sleep(0.01)
+    assert cache.get("key") == "new"
+    assert cache.stats()["stale_hits"] == 1
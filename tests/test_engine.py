@@ -0,0 +1,55 @@
+import random
+import time
+from neurons.score import engine
+from neurons.score.twitter_score import read_tweets
+from neurons.score.reddit_score import read_posts
+from neurons.timestamps import to_epochs, format_iso_millis
+
+
+def tweet(tweet_id: str, text: str = "News about BTC", epoch: int = 1700000000) -> dict:
+    return {"id": tweet_id, "url": f"https://twitter.com/user/status/{tweet_id}", "text": text, "timestamp": format_iso_millis(epoch)}
+
+
+def test_flatten_flags_malformed_forged_and_duplicated_responses():
+    responses = [
+        [tweet("1"), tweet("2", text="unrelated")],
+        [tweet("1"), {"id": "3"}],
+        [tweet("1"), dict(tweet("4"), url="https://twitter.com/user/status/1234")],
+        [tweet("2"), tweet("2")],
+        None,
+        [tweet("5"), dict(tweet("6"), timestamp="not a date")],
+    ]
+    columns = engine.flatten(responses, "BTC", read_tweets, to_epochs)
+
+    assert responses[4] == []
+    assert columns.length.tolist() == [2, 2, 2, 2, 0, 2]
+    assert columns.format.tolist() == [0, 1, 0, 0, 1, 1]
+    assert columns.fake.tolist() == [0, 0, 1, 1, 0, 0]
+    # The malformed item of miner 1 is dropped, every other item is kept.
+    assert columns.miner.tolist() == [0, 0, 1, 2, 2, 3, 3, 5, 5]
+    assert columns.relevant.tolist() == [1, 0, 1, 1, 1, 1, 1, 1, 1]
+    assert columns.timestamp.tolist()[:2] == [1700000000, 1700000000]
+
+
+def test_flatten_reads_reddit_posts():
+    post = {"id": "t3_a", "text": "btc", "title": "", "timestamp": "2023-11-20T10:00:00.000Z", "dataType": "post"}
+    columns = engine.flatten([[post], [{key: value for key, value in post.items() if key != "dataType"}]], "btc", read_posts, to_epochs)
+    assert columns.format.tolist() == [0, 1]
+    assert columns.miner.tolist() == [0]
+
+
+def test_round_of_256_miners_scores_well_under_a_second():
+    random.seed(0)
+    pool = [str(1700000000000000000 + i) for i in range(20000)]
+    tweets = {tweet_id: tweet(tweet_id, epoch=1700000000 + i) for i, tweet_id in enumerate(pool)}
+    # Miners return overlapping tweets, each as its own deserialized dict.
+    responses = [[dict(tweets[tweet_id]) for tweet_id in random.sample(pool, 1000)] for _ in range(256)]
+
+    begin = time.perf_counter()
+    columns = engine.flatten(responses, "btc", read_tweets, to_epochs)
+    metrics = engine.score(columns, [1] * len(responses))
+    elapsed = time.perf_counter() - begin
+
+    assert columns.miner.numel() == 256000
+    assert metrics["normalized_scores"].sum().item() > 0.99
+    assert elapsed < 1.0
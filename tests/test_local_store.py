@@ -0,0 +1,70 @@
+import os
+import time
+from neurons.storage import local_store
+from neurons.storage.local_store import LocalStore
+
+
+def iso(epoch: float) -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime(epoch))
+
+
+def items(now: float):
+    return [
+        {"id": "1", "text": "Bittensor is up", "timestamp": iso(now - 30)},
+        {"id": "2", "text": "nothing to see", "timestamp": iso(now - 20)},
+        {"id": "3", "text": "more about BITTENSOR", "timestamp": iso(now - 10)},
+        {"id": "4", "text": "no timestamp"},
+    ]
+
+
+def test_latest_matches_substrings_newest_first(tmp_path):
+    store = LocalStore(os.path.join(tmp_path, "store.db"))
+    now = time.time()
+    assert store.ingest("twitter", items(now), keyword = "bittensor") == 3
+
+    assert [item["id"] for item in store.latest("twitter", "tens", 10)] == ["3", "1"]
+    assert [item["id"] for item in store.latest("twitter", "up", 10)] == ["1"]
+    assert store.latest("reddit", "tens", 10) == []
+    assert store.watermark("twitter", "Bittensor") == int(now - 10)
+
+
+def test_without_trigram_support_falls_back_to_like(tmp_path, monkeypatch):
+    path = os.path.join(tmp_path, "store.db")
+    LocalStore(path)
+    now = time.time()
+
+    # The same file opened by an SQLite build without the trigram tokenizer.
+    monkeypatch.setattr(local_store, "trigram_supported", lambda: False)
+    store = LocalStore(path)
+    assert not store.fts
+    store.ingest("twitter", items(now))
+    assert [item["id"] for item in store.latest("twitter", "tens", 10)] == ["3", "1"]
+
+    # Back on a build with trigram support, items ingested meanwhile are indexed.
+    monkeypatch.undo()
+    store = LocalStore(path)
+    assert store.fts
+    assert [item["id"] for item in store.latest("twitter", "tens", 10)] == ["3", "1"]
+
+
+def test_prune_applies_retention_and_size(tmp_path):
+    store = LocalStore(os.path.join(tmp_path, "store.db"), retention_secs = 25, max_items = 1)
+    store.ingest("twitter", items(time.time()))
+    assert store.prune() == 2
+    assert [item["id"] for item in store.latest("twitter", "tens", 10)] == ["3"]
+    assert store.count() == 1
+
+
+def test_truncated_scrapes_do_not_skip_past_cut_off_items(tmp_path):
+    store = LocalStore(os.path.join(tmp_path, "store.db"))
+    now = time.time()
+    store.ingest("twitter", items(now)[:1], keyword = "bittensor")
+    assert store.watermark("twitter", "bittensor") == int(now - 30)
+
+    # Items older than the batch may be missing, so the mark only reaches its oldest item.
+    batch = [{"id": str(n), "text": "bittensor", "timestamp": iso(now - n)} for n in (5, 15, 25)]
+    store.ingest("twitter", batch, keyword = "bittensor", complete = False)
+    assert store.watermark("twitter", "bittensor") == int(now - 25)
+
+    store.ingest("twitter", batch, keyword = "bittensor")
+    assert store.watermark("twitter", "bittensor") == int(now - 5)
@@ -0,0 +1,50 @@
+import asyncio
+import gc
+from neurons.rounds import RoundScheduler, RoundSpec
+
+
+def spec(name: str, interval: float = 0.01, concurrency: int = 2) -> RoundSpec:
+    return RoundSpec(name = name, interval = interval, concurrency = concurrency, synapse = None, scorer = None, alpha = 0.1)
+
+
+def test_running_rounds_are_held_and_released():
+    finished = []
+
+    async def main():
+        gate = asyncio.Event()
+
+        async def run_round(spec):
+            await gate.wait()
+            finished.append(spec.name)
+
+        scheduler = RoundScheduler([spec("twitter")], run_round)
+        runner = asyncio.ensure_future(scheduler.run())
+        await asyncio.sleep(0.05)
+        gc.collect()
+        # Two rounds fill the concurrency; both are held by the scheduler.
+        assert len(scheduler._tasks) == 2
+        assert scheduler.running["twitter"] == 2
+        gate.set()
+        await asyncio.sleep(0.05)
+        runner.cancel()
+        return scheduler
+
+    scheduler = asyncio.run(main())
+    assert len(finished) >= 2
+    assert scheduler.started["twitter"] >= 2
+
+
+def test_failing_rounds_free_their_slot():
+    async def main():
+        async def run_round(spec):
+            raise RuntimeError("boom")
+
+        scheduler = RoundScheduler([spec("reddit", concurrency = 1)], run_round)
+        runner = asyncio.ensure_future(scheduler.run())
+        await asyncio.sleep(0.05)
+        runner.cancel()
+        return scheduler
+
+    scheduler = asyncio.run(main())
+    assert scheduler.started["reddit"] > 1
+    assert scheduler.running["reddit"] <= 1
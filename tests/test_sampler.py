@@ -0,0 +1,22 @@
+from neurons.sampler import CoverageSampler
+
+
+def test_unscored_miners_come_first():
+    sampler = CoverageSampler(min_revisit = 600)
+    sampler.observe(0, "a", 1.0)
+    sampler.observe(1, "b", 1.0, when = 0)
+    assert sampler.select([0, 1, 2], 2) == [2, 1]
+
+
+def test_reregistered_uid_starts_afresh():
+    sampler = CoverageSampler(min_revisit = 600)
+    sampler.observe(0, "a", 1.0)
+    sampler.observe_checks(0, "a", 5, 0)
+    sampler.observe(1, "b", 1.0)
+    sampler.observe(2, "c", 1.0)
+
+    # Uid 0 was taken over by hotkey "x", uid 2 left the metagraph.
+    assert sorted(sampler.sync(["x", "b"])) == [0, 2]
+    assert sampler.check_history(0, "x") == (0.0, 0.0)
+    assert sampler.select([0, 1], 1) == [0]
+    assert sampler.coverage([0, 1])["never_scored"] == 1
@@ -0,0 +1,82 @@
+import os
+import torch
+from neurons.score_journal import ScoreJournal, resize_scores
+
+HOTKEYS = ["a", "b", "c"]
+
+
+def test_nothing_saved_restores_none(tmp_path):
+    assert ScoreJournal(str(tmp_path)).restore(HOTKEYS) is None
+
+
+def test_checkpoint_plus_replay(tmp_path):
+    journal = ScoreJournal(str(tmp_path))
+    journal.append(10, "twitter", [(0, "a", 1.0, 0.3), (1, "b", 0.5, 0.15)])
+    journal.checkpoint(11, torch.tensor([0.3, 0.15, 0.0]), HOTKEYS)
+    journal.append(12, "reddit", [(1, "b", 1.0, 0.4), (2, "c", 1.0, 0.3)])
+    journal.close()
+
+    reopened = ScoreJournal(str(tmp_path))
+    restored = reopened.restore(HOTKEYS)
+    assert torch.allclose(restored, torch.tensor([0.3, 0.4, 0.3]))
+
+    # Appends after a restart go to a new segment and are replayed too.
+    reopened.append(13, "twitter", [(0, "a", 0.0, 0.2)])
+    reopened.close()
+    assert torch.allclose(ScoreJournal(str(tmp_path)).restore(HOTKEYS), torch.tensor([0.2, 0.4, 0.3]))
+
+
+def test_entries_of_replaced_hotkeys_are_dropped(tmp_path):
+    journal = ScoreJournal(str(tmp_path))
+    journal.checkpoint(1, torch.tensor([0.5, 0.5, 0.0]), HOTKEYS)
+    journal.append(2, "twitter", [(2, "c", 1.0, 0.3)])
+    journal.close()
+
+    restored = ScoreJournal(str(tmp_path)).restore(["a", "new", "other"])
+    assert torch.allclose(restored, torch.tensor([0.5, 0.0, 0.0]))
+
+
+def test_truncated_last_line_is_skipped(tmp_path):
+    journal = ScoreJournal(str(tmp_path))
+    journal.append(1, "twitter", [(0, "a", 1.0, 0.3)])
+    journal.append(2, "twitter", [(1, "b", 1.0, 0.3)])
+    path = journal._segment_path(journal.segment)
+    journal.close()
+    with open(path, "rb+") as f:
+        f.truncate(os.path.getsize(path) - 20)
+
+    restored = ScoreJournal(str(tmp_path)).restore(HOTKEYS)
+    assert torch.allclose(restored, torch.tensor([0.3, 0.0, 0.0]))
+
+
+def test_deregistered_uids_do_not_grow_the_vector(tmp_path):
+    journal = ScoreJournal(str(tmp_path))
+    journal.append(1, "twitter", [(0, "a", 1.0, 0.3), (5, "gone", 1.0, 0.3)])
+    journal.close()
+
+    restored = ScoreJournal(str(tmp_path)).restore(HOTKEYS)
+    assert restored.shape == (3,)
+    assert torch.allclose(restored, torch.tensor([0.3, 0.0, 0.0]))
+
+
+def test_old_segments_are_pruned(tmp_path):
+    journal = ScoreJournal(str(tmp_path), keep_segments = 2)
+    for block in range(5):
+        journal.append(block, "twitter", [(0, "a", 1.0, float(block))])
+        journal.checkpoint(block, torch.tensor([float(block), 0.0, 0.0]), HOTKEYS)
+    journal.close()
+    assert len(journal._segments()) <= 2
+    assert [record["block"] for record in journal.read_history()] == [3, 4]
+
+
+def test_spot_check_counts_are_journaled(tmp_path):
+    journal = ScoreJournal(str(tmp_path))
+    journal.append(10, "twitter", [(0, "a", 1.0, 0.3), (1, "b", 0.0, 0.0)], alpha = 0.7, checks = [(3, 0), None])
+    records = list(journal.read_history())
+    assert (records[0]["checked"], records[0]["failed"]) == (3, 0)
+    assert "checked" not in records[1]
+
+
+def test_resize_scores_pads_and_truncates():
+    assert resize_scores(torch.tensor([0.5, 0.25]), 3).tolist() == [0.5, 0.25, 0.0]
+    assert resize_scores(torch.tensor([0.5, 0.25, 0.125]), 2).tolist() == [0.5, 0.25]
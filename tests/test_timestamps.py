@@ -0,0 +1,39 @@
+import random
+from datetime import datetime, timezone
+from neurons import timestamps
+
+
+def test_provider_layouts():
+    assert timestamps.to_epoch("2011-04-25 16:55:15+00:00") == 1303750515
+    assert timestamps.to_epoch("2023-11-20T10:00:00.000Z") == 1700474400
+    assert timestamps.to_epoch("2023-11-20T12:00:00+02:00") == 1700474400
+    assert timestamps.to_epoch("2023-11-20T05:00:00-0500") == 1700474400
+    assert timestamps.to_epoch(1700474400.9) == 1700474400
+
+
+def test_invalid_values():
+    assert timestamps.to_epoch("2023-02-29T00:00:00Z") is None
+    assert timestamps.to_epoch("not a date") is None
+    assert timestamps.to_epoch(None) is None
+    assert timestamps.to_epoch(True) is None
+
+
+def test_fast_path_agrees_with_datetime():
+    random.seed(0)
+    for _ in range(2000):
+        epoch = random.randrange(0, 4102444800)
+        text = datetime.fromtimestamp(epoch, timezone.utc).isoformat()
+        assert timestamps.to_epoch(text) == epoch
+        assert timestamps.to_epoch(timestamps.format_iso_millis(epoch)) == epoch
+
+
+def test_batches_match_single_conversions():
+    values = ["2023-11-20T10:00:00.000Z", "bad", 5, "2023-11-20T10:00:00.000Z", None]
+    assert timestamps.to_epochs(values) == [timestamps.to_epoch(value) for value in values]
+
+
+def test_formatting():
+    assert timestamps.format_iso_millis(1700474400) == "2023-11-20T10:00:00.000Z"
+    assert timestamps.format_iso_millis(1700474400.5) == "2023-11-20T10:00:00.500Z"
+    assert timestamps.to_utc_text("2023-11-20T10:00:00.000Z") == "2023-11-20 10:00:00+00:00"
+    assert timestamps.to_utc_text("2023-11-20T12:00:00+02:00") == "2023-11-20 12:00:00+02:00"
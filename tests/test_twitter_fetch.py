@@ -0,0 +1,55 @@
+import asyncio
+from neurons.score import twitter_score
+
+
+class FakeProvider:
+    def __init__(self, delay: float, drop=lambda url: False):
+        self.delay = delay
+        self.drop = drop
+        self.calls = 0
+        self.cancelled = 0
+
+    async def searchByUrlAsync(self, urls):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return [{"id": url.rsplit("/", 1)[1], "url": url} for url in urls if not self.drop(url)]
+
+
+URLS = [f"https://x.com/user/status/{index}" for index in range(100)]
+
+
+def test_hedges_and_retries_fill_in_missing_tweets(monkeypatch):
+    primary = FakeProvider(0.2, drop = lambda url: url.endswith("7"))
+    fallback = FakeProvider(0.05)
+    monkeypatch.setattr(twitter_score, "twitter_query", primary)
+    monkeypatch.setattr(twitter_score, "fallback_query", fallback)
+
+    tweets, calls = twitter_score.fetch_tweets(URLS, hedge_after = 0.1, deadline = 5)
+    assert len(tweets) == 100
+    assert calls == primary.calls + fallback.calls
+
+
+def test_extra_lookups_stay_within_the_call_budget(monkeypatch):
+    primary = FakeProvider(0.2, drop = lambda url: url.endswith("7"))
+    fallback = FakeProvider(0.05)
+    monkeypatch.setattr(twitter_score, "twitter_query", primary)
+    monkeypatch.setattr(twitter_score, "fallback_query", fallback)
+
+    tweets, calls = twitter_score.fetch_tweets(URLS, hedge_after = 0.1, deadline = 5, max_calls = 6)
+    assert calls == primary.calls + fallback.calls == 6
+    # Every batch was still sent; only the extra lookups were cut.
+    assert len(tweets) >= 90
+
+
+def test_lookups_running_at_the_deadline_are_cancelled(monkeypatch):
+    primary = FakeProvider(10)
+    monkeypatch.setattr(twitter_score, "twitter_query", primary)
+    monkeypatch.setattr(twitter_score, "fallback_query", FakeProvider(10))
+
+    tweets, calls = twitter_score.fetch_tweets(URLS[:20], hedge_after = 5, deadline = 0.3)
+    assert tweets == []
+    assert primary.cancelled == 1
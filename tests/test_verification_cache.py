@@ -0,0 +1,32 @@
+import os
+import time
+from neurons.score.verification_cache import VerificationCache
+
+
+def test_put_and_get(tmp_path):
+    cache = VerificationCache(os.path.join(tmp_path, "cache.db"))
+    cache.put_many("twitter", [{"id": 1, "text": "a"}, {"id": "2", "text": "b"}, {"text": "no id"}])
+
+    found = cache.get_many("twitter", [1, "2", "3"])
+    assert found == {"1": {"id": 1, "text": "a"}, "2": {"id": "2", "text": "b"}}
+    assert cache.get_many("reddit", [1]) == {}
+    assert cache.stats()["hits"] == 2
+
+
+def test_expired_entries_are_missing(tmp_path):
+    cache = VerificationCache(os.path.join(tmp_path, "cache.db"), ttl = 60)
+    cache.put_many("twitter", [{"id": "1"}])
+    conn = cache._connection()
+    with conn:
+        conn.execute("UPDATE verified SET fetched_at = ?", (time.time() - 120,))
+    assert cache.get_many("twitter", ["1"]) == {}
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = VerificationCache(os.path.join(tmp_path, "cache.db"), max_entries = 2)
+    cache.put_many("twitter", [{"id": "1"}, {"id": "2"}])
+    conn = cache._connection()
+    with conn:
+        conn.execute("UPDATE verified SET accessed_at = accessed_at - 10 WHERE id = '1'")
+    cache.put_many("twitter", [{"id": "3"}])
+    assert set(cache.get_many("twitter", ["1", "2", "3"])) == {"2", "3"}
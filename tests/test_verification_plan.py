@@ -0,0 +1,120 @@
+import math
+import random
+from neurons.score.verification_plan import VerificationPlanner, confidence
+
+
+def make_round(miners: int, items: int, forged: dict = None):
+    forged = forged or {}
+    return [
+        [{"id": f"{miner}-{index}", "forged": random.random() < forged.get(miner, 0.0)} for index in range(items)]
+        for miner in range(miners)
+    ]
+
+
+def matches(item, original):
+    return not item["forged"]
+
+
+def provider(batch_size: int = 20, returns=lambda wave, items: items):
+    """
+    A fake provider returning the items chosen by `returns`, charging one call per batch.
+    """
+    waves = []
+
+    def fetch(items, max_calls):
+        waves.append(len(items))
+        returned = returns(len(waves), items)
+        return {item["id"]: item for item in returned}, math.ceil(len(items) / batch_size)
+
+    return fetch, waves
+
+
+def test_confidence_grows_with_clean_checks_and_drops_with_failures():
+    assert math.isclose(confidence(0, 0, 0.2), 0.2)
+    assert confidence(10, 0, 0.2) > confidence(5, 0, 0.2) > confidence(1, 0, 0.2)
+    assert confidence(10, 1, 0.2) < confidence(10, 0, 0.2)
+
+
+def test_forgers_are_caught_within_budget():
+    random.seed(1)
+    responses = make_round(25, 100, forged = {3: 0.3, 7: 0.3})
+    fetch, waves = provider()
+    result = VerificationPlanner(batch_size = 20, max_calls = 5).verify(responses, fetch, matches)
+
+    assert result["calls"] <= 5
+    assert result["correct"][3] == 0 and result["correct"][7] == 0
+    assert all(result["correct"][miner] == 1 for miner in range(25) if miner not in (3, 7))
+    assert all(checked >= 1 for checked in result["checked"])
+
+
+def test_clean_history_settles_early():
+    random.seed(2)
+    responses = make_round(10, 100)
+    fetch, waves = provider()
+    result = VerificationPlanner(batch_size = 20, max_calls = 5).verify(responses, fetch, matches, history = [(20.0, 0.0)] * 10)
+
+    assert result["correct"] == [1] * 10
+    assert len(waves) == 1
+    assert result["calls"] == 1
+    assert all(value >= 0.9 for value in result["confidence"])
+
+
+def test_missing_items_fail_only_in_the_first_wave():
+    random.seed(3)
+    responses = make_round(3, 100)
+    # The first wave returns everything; later waves return a single item.
+    fetch, waves = provider(returns = lambda wave, items: items if wave == 1 else items[:1])
+    result = VerificationPlanner(batch_size = 20, max_calls = 5).verify(responses, fetch, matches)
+
+    assert len(waves) > 1
+    assert result["correct"] == [1, 1, 1]
+    assert result["failed"] == [0, 0, 0]
+
+    missing = make_round(3, 100)
+    fetch, waves = provider(returns = lambda wave, items: [item for item in items if not item["id"].startswith("1-")])
+    result = VerificationPlanner(batch_size = 20, max_calls = 5).verify(missing, fetch, matches)
+    assert result["correct"] == [1, 0, 1]
+
+
+def test_empty_responses_are_not_checked():
+    fetch, waves = provider()
+    result = VerificationPlanner().verify([[], []], fetch, matches)
+    assert result["correct"] == [0, 0]
+    assert result["checked"] == [0, 0]
+    assert waves == []
+
+
+def test_provider_misses_on_extra_checks_do_not_fail_miners():
+    random.seed(4)
+    responses = make_round(3, 100)
+
+    # Drop half of every wave, but never the first item sent for a miner.
+    def returns(wave, items):
+        kept, seen = [], set()
+        for n, item in enumerate(items):
+            miner = item["id"].split("-")[0]
+            if miner not in seen or n % 2:
+                kept.append(item)
+            seen.add(miner)
+        return kept
+
+    fetch, waves = provider(returns = returns)
+    result = VerificationPlanner(batch_size = 20, max_calls = 5).verify(responses, fetch, matches)
+
+    assert waves[0] > 3
+    assert result["correct"] == [1, 1, 1]
+    assert result["failed"] == [0, 0, 0]
+
+
+def test_random_provider_misses_cost_no_more_than_one_check():
+    random.seed(5)
+    zeroed = total = 0
+    for _ in range(40):
+        responses = make_round(3, 100)
+        fetch, waves = provider(returns = lambda wave, items: [item for item in items if random.random() >= 0.1])
+        result = VerificationPlanner(batch_size = 20, max_calls = 5).verify(responses, fetch, matches)
+        assert all(failed <= 1 for failed in result["failed"])
+        zeroed += result["correct"].count(0)
+        total += len(responses)
+    # With one mandatory check per miner, about 10% of honest miners are zeroed.
+    assert zeroed / total < 0.2